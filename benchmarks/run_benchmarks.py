@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+# 允许以 python benchmarks/run_benchmarks.py 方式直接运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.login_page import LoginPage
+from utils.browser_manager import BrowserManager
+from utils.mock_server import MockLoginServer
+from utils.test_data import TestData, registry
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# 上下文创建/关闭的配置组合
+CONTEXT_SETTINGS = {
+    "maximized_fast": {"MAXIMIZED": "true", "FAST_START": "true"},
+    "maximized_legacy": {"MAXIMIZED": "true", "FAST_START": "false"},
+    "viewport": {"MAXIMIZED": "false", "FAST_START": "true"},
+}
+
+
+@contextmanager
+def env(**values):
+    """临时设置环境变量"""
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def measure(func, repeat):
+    """重复执行函数，返回每次耗时(毫秒)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bench_browser_start(repeat):
+    manager = BrowserManager()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manager.start()
+        samples.append((time.perf_counter() - start) * 1000)
+        manager.stop()
+    return {"browser.start": samples}
+
+
+def bench_contexts(repeat):
+    results = {}
+    for name, settings in CONTEXT_SETTINGS.items():
+        with env(**settings):
+            manager = BrowserManager()
+            manager.start()
+            try:
+                create_samples, close_samples = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    manager.create_context()
+                    create_samples.append((time.perf_counter() - start) * 1000)
+                    start = time.perf_counter()
+                    manager.close_context()
+                    close_samples.append((time.perf_counter() - start) * 1000)
+            finally:
+                manager.stop()
+        results[f"context.create[{name}]"] = create_samples
+        results[f"context.close[{name}]"] = close_samples
+    return results
+
+
+def bench_page_actions(manager, repeat):
+    manager.create_context()
+    try:
+        login_page = LoginPage(manager.get_page())
+        results = {
+            "page.navigate": measure(login_page.open, repeat),
+            "page.fill_text": measure(lambda: login_page.enter_username("tomsmith"), repeat),
+            "page.wait_for_selector": measure(lambda: login_page.wait_for_selector(login_page.LOGIN_BUTTON), repeat),
+            "page.get_text": measure(lambda: login_page.get_text("h2"), repeat),
+            "page.is_visible": measure(lambda: login_page.is_visible(login_page.USERNAME_INPUT), repeat),
+        }
+
+        def submit():
+            login_page.open()
+            login_page.click_element(login_page.LOGIN_BUTTON)
+        results["page.click_element+navigation"] = measure(submit, repeat)
+
+        page = manager.get_page()
+        results["screenshot.viewport_jpeg"] = measure(lambda: page.screenshot(type="jpeg", quality=80), repeat)
+        results["screenshot.full_page_png"] = measure(lambda: page.screenshot(type="png", full_page=True), repeat)
+    finally:
+        manager.close_context()
+    return results
+
+
+def bench_test_data(repeat):
+    def cold_load():
+        registry.clear()
+        TestData.get_test_urls()
+        TestData.get_login_credentials()
+    results = {"test_data.cold_load": measure(cold_load, repeat)}
+    results["test_data.cached_load"] = measure(
+        lambda: (TestData.get_test_urls(), TestData.get_login_credentials()), repeat * 10)
+    return results
+
+
+def run_benchmarks(repeat):
+    """运行所有基准测试，返回 {指标: 中位数毫秒}"""
+    server = MockLoginServer(latency_ms=0)
+    samples = {}
+    with env(TEST_BASE_URL=server.start(), HEADLESS=os.environ.get("HEADLESS", "true"),
+             TRACE_MODE="off", CONTEXT_POOL_SIZE="0"):
+        try:
+            samples.update(bench_browser_start(repeat))
+            samples.update(bench_contexts(repeat))
+            manager = BrowserManager()
+            manager.start()
+            try:
+                samples.update(bench_page_actions(manager, repeat))
+            finally:
+                manager.stop()
+            samples.update(bench_test_data(repeat))
+        finally:
+            server.stop()
+    return {name: round(statistics.median(values), 3) for name, values in samples.items()}
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """与基准比较，返回回归的指标列表
+
+    当前值超过基准的(1+threshold)倍且绝对差值大于min_delta_ms时视为回归，避免亚毫秒指标的噪声误报。
+    """
+    regressions = []
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if value > base * (1 + threshold) and value - base > min_delta_ms:
+            regressions.append((name, base, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="框架自身开销的基准测试(离线，使用本地模拟服务器)")
+    parser.add_argument("--repeat", type=int, default=5, help="每个指标的重复次数，取中位数")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基准JSON文件路径")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCHMARK_THRESHOLD", "0.2")),
+                        help="允许的相对退化比例，默认0.2即20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="视为回归的最小绝对差值(毫秒)")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基准文件")
+    parser.add_argument("--output", default=os.path.join("reports", "perf", "benchmarks.json"), help="本次结果输出路径")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat)
+    for name, value in sorted(results.items()):
+        print(f"{name}: {value}ms")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"基准已更新: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"基准文件不存在: {args.baseline}，使用 --update-baseline 生成")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"性能回归(阈值 {args.threshold:.0%}):")
+        for name, base, value in regressions:
+            print(f"  {name}: {base}ms -> {value}ms (+{(value / base - 1) if base else 0:.0%})")
+        return 1
+    print("未发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,217 @@
+import os
+import time
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from utils.timeout_policy import timeout_policy
+from utils.timing import timed
+
+# Playwright支持的导航等待条件
+WAIT_UNTIL_OPTIONS = ("load", "domcontentloaded", "networkidle", "commit")
+
+# 批量断言脚本: 在浏览器中一次检查所有期望，返回不满足的项
+CHECK_ELEMENTS_SCRIPT = """(expectations) => {
+    const isVisible = (element) => {
+        const style = window.getComputedStyle(element);
+        const rect = element.getBoundingClientRect();
+        return style.visibility !== "hidden" && rect.width > 0 && rect.height > 0;
+    };
+    const failures = [];
+    for (const expectation of expectations) {
+        const elements = Array.from(document.querySelectorAll(expectation.selector));
+        const first = elements[0];
+        const fail = (check, expected, actual) => failures.push({
+            selector: expectation.selector,
+            message: expectation.message || null,
+            check: check,
+            expected: expected,
+            actual: actual
+        });
+        if (expectation.count !== undefined && expectation.count !== null && elements.length !== expectation.count) {
+            fail("count", expectation.count, elements.length);
+        }
+        if (expectation.visible !== undefined && expectation.visible !== null) {
+            const visible = !!first && isVisible(first);
+            if (visible !== expectation.visible) {
+                fail("visible", expectation.visible, visible);
+            }
+        }
+        if (expectation.text_contains !== undefined && expectation.text_contains !== null) {
+            const text = first ? first.textContent : null;
+            if (text === null || !text.includes(expectation.text_contains)) {
+                fail("text_contains", expectation.text_contains, text === null ? null : text.trim());
+            }
+        }
+    }
+    return failures;
+}"""
 
 class BasePage:
+    # 导航策略: 子类可以覆盖页面默认的等待条件和"就绪"元素
+    # WAIT_UNTIL为None时使用环境变量NAVIGATION_WAIT_UNTIL(默认networkidle)
+    WAIT_UNTIL = None
+    # 导航后等待该元素可见即视为页面就绪
+    READY_SELECTOR = None
+    # 超时策略: 子类可以覆盖页面默认超时和单个选择器的超时(毫秒)
+    # DEFAULT_TIMEOUT为None时使用环境变量DEFAULT_TIMEOUT_MS(默认10000)
+    DEFAULT_TIMEOUT = None
+    SELECTOR_TIMEOUTS = {}
+    
     def __init__(self, page: Page):
         self.page = page
-        self.default_timeout = 10000  # 默认超时时间（毫秒）
+        self.default_timeout = self.DEFAULT_TIMEOUT or timeout_policy.default_timeout  # 默认超时时间（毫秒）
+        self._locators = {}  # 按选择器缓存的Locator对象
+        
+    def get_timeout(self, selector=None, negative=False):
+        """Resolve the timeout for a selector: per-selector override > timeout policy
+        
+        Negative checks (waiting for an element to go away) use the short fast-fail timeout;
+        with ADAPTIVE_TIMEOUTS=true other waits are tuned from the recorded history.
+        """
+        if selector in self.SELECTOR_TIMEOUTS:
+            return self.SELECTOR_TIMEOUTS[selector]
+        return timeout_policy.timeout_for(selector, self.default_timeout, negative)
         
-    def navigate(self, url):
-        """Navigate to the given URL"""
-        self.page.goto(url, wait_until="networkidle")
+    def _wait(self, selector, action, negative=False, timeout=None):
+        """Run a waiting action with the resolved timeout and record how long the wait took"""
+        start = time.perf_counter()
+        result = action(timeout or self.get_timeout(selector, negative))
+        if not negative:
+            timeout_policy.record(selector, (time.perf_counter() - start) * 1000)
+        return result
+        
+    def get_wait_until(self, wait_until=None):
+        """Resolve the navigation wait condition: per call > page class > env"""
+        wait_until = wait_until or self.WAIT_UNTIL or os.environ.get("NAVIGATION_WAIT_UNTIL", "networkidle")
+        if wait_until not in WAIT_UNTIL_OPTIONS:
+            raise ValueError(f"Unsupported wait_until '{wait_until}', expected one of {WAIT_UNTIL_OPTIONS}")
+        return wait_until
+        
+    @timed("page.navigate")
+    def navigate(self, url, wait_until=None, ready_selector=None):
+        """Navigate to the given URL
+        
+        The page counts as loaded once the resolved wait_until event fires and,
+        if a ready selector is given (or set on the page class), that element is visible.
+        """
+        wait_until = self.get_wait_until(wait_until)
+        # 临时性网络错误按策略退避重试
+        timeout_policy.retry(
+            lambda: self.page.goto(url, wait_until=wait_until, timeout=self.default_timeout),
+            f"Navigation to {url}"
+        )
+        ready_selector = ready_selector or self.READY_SELECTOR
+        if ready_selector:
+            self._wait(ready_selector, lambda timeout: self.locator(ready_selector).wait_for(state="visible", timeout=timeout))
+        
+    def locator(self, selector):
+        """Get the cached Locator for a selector (first match, like the page-level selector APIs)"""
+        locator = self._locators.get(selector)
+        if locator is None:
+            locator = self.page.locator(selector).first
+            self._locators[selector] = locator
+        return locator
         
     def get_text(self, selector):
         """Get text content of an element"""
         try:
-            return self.page.text_content(selector, timeout=self.default_timeout)
+            return self._wait(selector, lambda timeout: self.locator(selector).text_content(timeout=timeout))
         except PlaywrightTimeoutError:
             raise Exception(f"Element with selector '{selector}' not found within timeout period")
     
     def is_visible(self, selector):
         """Check if element is visible"""
         try:
-            return self.page.is_visible(selector, timeout=self.default_timeout)
+            return self.locator(selector).is_visible()
         except PlaywrightTimeoutError:
             return False
             
-    def wait_for_selector(self, selector, state="visible"):
-        """Wait for an element to be in the specified state"""
+    @timed("page.read_element")
+    def read_element(self, selector, attributes=None, state="visible"):
+        """Wait for an element and read its text, visibility and attributes in one browser round-trip
+        
+        Returns a dict with text, visible and attributes. Only when the element is attached but
+        not yet in the requested state does it wait for the state and read again.
+        """
+        script = """(element, names) => {
+            const style = window.getComputedStyle(element);
+            const rect = element.getBoundingClientRect();
+            const attributes = {};
+            for (const name of names) {
+                attributes[name] = element.getAttribute(name);
+            }
+            return {
+                text: element.textContent,
+                visible: style.visibility !== "hidden" && rect.width > 0 && rect.height > 0,
+                attributes: attributes
+            };
+        }"""
+        locator = self.locator(selector)
+        names = list(attributes or [])
+        try:
+            result = self._wait(selector, lambda timeout: locator.evaluate(script, names, timeout=timeout))
+            if state == "visible" and not result["visible"]:
+                self._wait(selector, lambda timeout: locator.wait_for(state="visible", timeout=timeout))
+                result = locator.evaluate(script, names, timeout=self.default_timeout)
+            return result
+        except PlaywrightTimeoutError:
+            raise Exception(f"Element with selector '{selector}' not found within timeout period")
+            
+    @timed("page.wait_for_selector")
+    def wait_for_selector(self, selector, state="visible", timeout=None):
+        """Wait for an element to be in the specified state
+        
+        Waiting for hidden/detached is a negative check and fails fast with the short timeout.
+        """
+        negative = state in ("hidden", "detached")
         try:
-            self.page.wait_for_selector(selector, state=state, timeout=self.default_timeout)
+            self._wait(selector, lambda wait_timeout: self.locator(selector).wait_for(state=state, timeout=wait_timeout),
+                       negative=negative, timeout=timeout)
             return True
         except PlaywrightTimeoutError:
             return False
             
+    @timed("page.click_element")
     def click_element(self, selector):
         """Click on an element after waiting for it"""
         try:
-            self.page.click(selector, timeout=self.default_timeout)
+            self._wait(selector, lambda timeout: self.locator(selector).click(timeout=timeout))
         except PlaywrightTimeoutError:
             raise Exception(f"Could not click element with selector '{selector}' within timeout period")
             
+    @timed("page.fill_text")
     def fill_text(self, selector, text):
         """Fill a text field after waiting for it"""
         try:
-            self.page.fill(selector, text, timeout=self.default_timeout)
+            self._wait(selector, lambda timeout: self.locator(selector).fill(text, timeout=timeout))
         except PlaywrightTimeoutError:
-            raise Exception(f"Could not fill element with selector '{selector}' within timeout period") 
\ No newline at end of file
+            raise Exception(f"Could not fill element with selector '{selector}' within timeout period")
+            
+    @timed("page.check_elements")
+    def check_elements(self, expectations, timeout=None):
+        """Check several element expectations at once and return every failure
+        
+        Each expectation is a dict with a CSS "selector" and any of "visible" (bool),
+        "text_contains" (str) and "count" (int), plus an optional "message" used in reports.
+        All expectations are polled together in the browser until they pass or the timeout
+        expires, so a passing check costs a single round-trip.
+        """
+        expectations = list(expectations)
+        try:
+            self.page.wait_for_function(
+                f"(expectations) => ({CHECK_ELEMENTS_SCRIPT})(expectations).length === 0",
+                arg=expectations,
+                timeout=timeout or self.default_timeout
+            )
+            return []
+        except PlaywrightTimeoutError:
+            return self.page.evaluate(CHECK_ELEMENTS_SCRIPT, expectations)
+            
+    def assert_elements(self, expectations, timeout=None):
+        """Assert several element expectations at once, reporting all failures together"""
+        failures = self.check_elements(expectations, timeout)
+        if failures:
+            lines = [
+                f"{failure['message'] or failure['selector']}: {failure['check']} expected "
+                f"{failure['expected']!r}, got {failure['actual']!r}"
+                for failure in failures
+            ]
+            raise AssertionError(f"{len(failures)} element check(s) failed:\n" + "\n".join(lines))
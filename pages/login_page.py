@@ -2,8 +2,8 @@ from pages.base_page import BasePage
 from utils.test_data import TestData
 
 class LoginPage(BasePage):
-    # 从测试数据获取URL
-    URL = TestData.get_test_urls().get("login_url")
+    # 从测试数据获取URL(访问时才读取)
+    URL = TestData.lazy_url("login_url")
     
     # Locators
     USERNAME_INPUT = "#username"
@@ -11,11 +11,15 @@ class LoginPage(BasePage):
     LOGIN_BUTTON = "button[type='submit']"
     SUCCESS_MESSAGE = "#flash.success"
     ERROR_MESSAGE = "#flash.error"
+    FLASH_MESSAGE = "#flash"
+    
+    # 导航策略: 响应开始返回后只需等待用户名输入框可见
+    WAIT_UNTIL = "commit"
+    READY_SELECTOR = USERNAME_INPUT
     
     def open(self):
-        """Open the login page"""
+        """Open the login page, returning once the username field is visible"""
         self.navigate(self.URL)
-        self.wait_for_selector(self.USERNAME_INPUT)
         
     def enter_username(self, username):
         """Enter username into the username field"""
@@ -31,13 +35,17 @@ class LoginPage(BasePage):
         
     def get_success_message(self):
         """Get the success message after successful login"""
-        self.wait_for_selector(self.SUCCESS_MESSAGE)
-        return self.get_text(self.SUCCESS_MESSAGE)
+        return self.read_element(self.SUCCESS_MESSAGE)["text"]
     
     def get_error_message(self):
         """Get the error message after failed login"""
-        self.wait_for_selector(self.ERROR_MESSAGE)
-        return self.get_text(self.ERROR_MESSAGE)
+        return self.read_element(self.ERROR_MESSAGE)["text"]
+    
+    def get_login_result(self):
+        """Wait for the flash message after submitting and return (kind, text), kind being success or error"""
+        flash = self.read_element(self.FLASH_MESSAGE, attributes=["class"])
+        kind = "success" if "success" in (flash["attributes"]["class"] or "").split() else "error"
+        return kind, flash["text"]
     
     def is_success_message_visible(self):
         """Check if success message is visible"""
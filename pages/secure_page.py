@@ -1,10 +1,21 @@
 from pages.base_page import BasePage
+from utils.test_data import TestData
 
 class SecurePage(BasePage):
+    # 从测试数据获取URL(访问时才读取)
+    URL = TestData.lazy_url("secure_url")
+    
     # Locators
     LOGOUT_BUTTON = "a.button[href='/logout']"
     SECURE_AREA_HEADER = "h2"
     
+    # 导航策略: DOM解析完成即可判断登录状态
+    WAIT_UNTIL = "domcontentloaded"
+    
+    def open(self):
+        """Open the secure area page"""
+        self.navigate(self.URL)
+        
     def is_logged_in(self):
         """Check if user is logged in by verifying the logout button is visible"""
         return self.is_visible(self.LOGOUT_BUTTON)
@@ -26,4 +26,23 @@
 
 * Open the login page
 * Login as invalid user
-* Verify error message "Your username is invalid!" 
\ No newline at end of file
+* Verify error message "Your username is invalid!" 
+
+## 使用缓存的登录状态
+
+* Login as valid user (cached)
+* Verify user is logged in
+
+## 批量验证多组凭据
+
+* Verify logins for credentials
+
+   |username|password            |expected|message                      |
+   |--------|--------------------|--------|-----------------------------|
+   |tomsmith|SuperSecretPassword!|success |You logged into a secure area!|
+   |invalid |wrongpassword       |error   |Your username is invalid!    |
+   |tomsmith|wrongpassword       |error   |Your password is invalid!    |
+
+## 从文件批量验证凭据
+
+* Verify logins from credentials file "test_data/login_matrix.csv"
\ No newline at end of file
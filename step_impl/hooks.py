@@ -1,32 +1,109 @@
-from getgauge.python import before_suite, after_suite, before_scenario, after_scenario, screenshot
-from utils.browser_manager import BrowserManager
+from getgauge.python import before_suite, after_suite, after_spec, before_scenario, after_scenario, before_step, after_step, screenshot
+from utils.browser_pool import BrowserPool, get_worker_id
+from utils.timing import perf_recorder
+from utils.artifact_writer import artifact_writer
+from utils.mock_server import MockLoginServer
+from utils.timeout_policy import timeout_policy
+from utils.impact import RuntimeCoverage
+from utils.sharding import ScenarioDurations
 import os
 import datetime
 
-# 浏览器管理器实例
-browser_manager = BrowserManager()
+# 浏览器池实例 - 每个worker(并行执行流)拥有独立的浏览器
+browser_pool = BrowserPool()
+
+# 测试影响分析的运行时依赖记录 - IMPACT_RECORD=true时启用
+runtime_coverage = RuntimeCoverage()
+
+# 场景耗时记录 - 供按耗时分片使用
+scenario_durations = ScenarioDurations()
+
+# 本地模拟服务器 - MOCK_SERVER=true时在before_suite中启动
+mock_server = None
 
 @before_suite
 def before_suite():
-    browser_manager.start()
+    global mock_server
+    with perf_recorder.measure("hook.before_suite"):
+        if os.environ.get("MOCK_SERVER", "false").lower() == "true":
+            mock_server = MockLoginServer()
+            # 将测试URL改写到本地服务器
+            os.environ["TEST_BASE_URL"] = mock_server.start()
+        browser_pool.start()
 
 @after_suite
 def after_suite():
-    browser_manager.stop()
+    with perf_recorder.measure("hook.after_suite"):
+        browser_pool.report_network_stats()
+        browser_pool.report_resources()
+        browser_pool.stop_all()
+        # 等待后台线程写完所有截图
+        artifact_writer.flush()
+        if mock_server:
+            mock_server.stop()
+
+    # 输出性能报告
+    report_paths = perf_recorder.write_report(get_worker_id())
+    if report_paths:
+        print(f"性能报告已写入: {', '.join(report_paths)}")
+    perf_recorder.print_top()
+    
+    # 保存选择器等待耗时历史并提示变慢的选择器
+    timeout_policy.report()
+    timeout_policy.save()
+    runtime_coverage.save(get_worker_id())
+    scenario_durations.save(get_worker_id())
+
+# 获取场景的上下文隔离级别: 场景标签 > 规范标签 > ISOLATION_LEVEL环境变量
+def get_isolation_level(context):
+    tags = list(context.scenario.tags or []) + list(context.specification.tags or [])
+    for tag in tags:
+        if tag.startswith("isolation:"):
+            return tag.split(":", 1)[1].strip()
+    return os.environ.get("ISOLATION_LEVEL", "scenario")
+
+@after_spec
+def after_spec():
+    with perf_recorder.measure("hook.after_spec"):
+        browser_pool.end_spec()
 
 @before_scenario
-def before_scenario():
-    browser_manager.create_context()
+def before_scenario(context):
+    scenario_durations.begin()
+    with perf_recorder.measure("hook.before_scenario"):
+        manager = browser_pool.get_manager()
+        # 用规范和场景名称命名跟踪文件和截图
+        manager.scenario_name = f"{context.specification.name}__{context.scenario.name}"
+        manager.begin_scenario(get_isolation_level(context))
+    runtime_coverage.start()
 
 @after_scenario
-def after_scenario():
-    browser_manager.close_context()
+def after_scenario(context):
+    runtime_coverage.stop(context.specification.file_name, context.scenario.name)
+    with perf_recorder.measure("hook.after_scenario"):
+        browser_pool.end_scenario(failed=context.scenario.is_failing)
+        # 补充预热池(通常在取用上下文时已开始补充，这里处理浏览器回收或泄漏清理后的情况)
+        browser_pool.prewarm_contexts()
+    scenario_durations.end(context.specification.file_name, context.scenario.name)
+
+# 记录每个步骤的耗时，按步骤文本汇总
+@before_step
+def before_step(context):
+    perf_recorder.begin(f"step: {context.step.text}")
+
+@after_step
+def after_step(context):
+    perf_recorder.end(f"step: {context.step.text}")
 
 # 注册截图函数
 @screenshot
 def capture_screenshot():
-    return browser_manager.take_screenshot()
+    return browser_pool.take_screenshot()
+
+# 获取当前worker的浏览器管理器
+def get_browser_manager():
+    return browser_pool.get_manager()
 
 # 获取当前页面实例的函数 - 暴露给其他步骤使用
 def get_page():
-    return browser_manager.get_page() 
\ No newline at end of file
+    return browser_pool.get_page()
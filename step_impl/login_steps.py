@@ -1,7 +1,14 @@
 from getgauge.python import step, data_store
 from pages.login_page import LoginPage
 from pages.secure_page import SecurePage
-from step_impl.hooks import get_page
+from step_impl.hooks import get_page, get_browser_manager
+from utils.auth_state import AuthStateCache
+from utils.browser_pool import get_worker_id
+from utils.login_matrix import LoginMatrixRunner
+from utils.test_data import TestData
+
+# 登录状态缓存 - 按用户和站点保存已登录上下文的storage state
+auth_state_cache = AuthStateCache()
 
 @step("Open the login page")
 def open_login_page():
@@ -48,6 +55,40 @@ def login_as_valid_user():
     secure_page = SecurePage(get_page())
     data_store.scenario["secure_page"] = secure_page
 
+@step("Login as valid user (cached)")
+def login_as_valid_user_cached():
+    credentials = TestData.get_login_credentials().get("valid_user")
+    username = credentials.get("username")
+    base_url = TestData.get_test_urls().get("base_url")
+    browser_manager = get_browser_manager()
+    
+    # 存在未过期的登录状态时，用它重新创建上下文并跳过界面登录
+    state_path = auth_state_cache.get_valid_path(username, base_url)
+    if state_path:
+        browser_manager.close_context()
+        browser_manager.create_context(storage_state=state_path)
+        secure_page = SecurePage(get_page())
+        secure_page.open()
+        if secure_page.is_logged_in():
+            data_store.scenario["login_page"] = LoginPage(get_page())
+            data_store.scenario["secure_page"] = secure_page
+            return
+        # 会话已在服务端失效，删除缓存后回退到界面登录
+        auth_state_cache.invalidate(username, base_url)
+    
+    login_page = LoginPage(get_page())
+    login_page.open()
+    login_page.login_as_valid_user()
+    secure_page = SecurePage(get_page())
+    # 提交后等待跳转到安全区域，确认登录成功后再保存登录状态
+    secure_page.assert_elements([
+        {"selector": secure_page.LOGOUT_BUTTON, "visible": True, "message": "注销按钮"}
+    ])
+    auth_state_cache.save(browser_manager.context, username, base_url)
+    
+    data_store.scenario["login_page"] = login_page
+    data_store.scenario["secure_page"] = secure_page
+
 @step("Login as invalid user")
 def login_as_invalid_user():
     login_page = data_store.scenario.get("login_page") or LoginPage(get_page())
@@ -58,15 +99,51 @@ def verify_success_message():
     login_page = data_store.scenario.get("login_page") or LoginPage(get_page())
     secure_page = data_store.scenario.get("secure_page") or SecurePage(get_page())
     
-    # 验证是否已登录
-    assert login_page.is_success_message_visible(), "成功消息不可见"
-    assert "You logged into a secure area!" in login_page.get_success_message(), "成功消息文本不匹配"
-    assert secure_page.is_logged_in(), "用户未登录 - 未找到注销按钮"
-    assert "Secure Area" in secure_page.get_header_text(), "未找到安全区域标题"
+    # 验证是否已登录 - 所有检查在一次浏览器往返中完成，失败时一并报告
+    login_page.assert_elements([
+        {"selector": login_page.SUCCESS_MESSAGE, "visible": True,
+         "text_contains": "You logged into a secure area!", "message": "成功消息"},
+        {"selector": secure_page.LOGOUT_BUTTON, "visible": True, "message": "注销按钮"},
+        {"selector": secure_page.SECURE_AREA_HEADER, "text_contains": "Secure Area", "message": "安全区域标题"}
+    ])
+
+@step("Verify user is logged in")
+def verify_logged_in():
+    secure_page = data_store.scenario.get("secure_page") or SecurePage(get_page())
+    
+    secure_page.assert_elements([
+        {"selector": secure_page.LOGOUT_BUTTON, "visible": True, "message": "注销按钮"},
+        {"selector": secure_page.SECURE_AREA_HEADER, "text_contains": "Secure Area", "message": "安全区域标题"}
+    ])
 
 @step("Verify error message <expected_message>")
 def verify_error_message(expected_message):
     login_page = data_store.scenario.get("login_page") or LoginPage(get_page())
     
     error_message = login_page.get_error_message()
-    assert expected_message in error_message, f"错误消息不匹配。预期: '{expected_message}', 实际: '{error_message}'" 
\ No newline at end of file
+    assert expected_message in error_message, f"错误消息不匹配。预期: '{expected_message}', 实际: '{error_message}'" 
+
+# 并发执行凭据表中的所有登录并汇总结果
+def verify_login_matrix(rows):
+    runner = LoginMatrixRunner(get_browser_manager())
+    summary = runner.run(rows)
+    report_path = runner.write_report(summary, get_worker_id())
+    data_store.scenario["login_matrix"] = summary
+    
+    print(f"批量登录: 共 {summary['total']} 行, 通过 {summary['passed']}, 失败 {summary['failed']}, "
+          f"并发 {summary['concurrency']}, 耗时 {summary['duration_ms']}ms, 报告: {report_path}")
+    failures = [
+        f"第{result['row']}行 {result['username']!r}: 预期 {result['expected']}, "
+        f"实际 {result['actual']} {result['error'] or result['message']!r}"
+        for result in summary["rows"] if not result["passed"]
+    ]
+    assert not failures, "批量登录校验失败:\n" + "\n".join(failures)
+
+@step("Verify logins for credentials <table>")
+def verify_logins_for_table(table):
+    rows = [dict(zip(table.headers, row)) for row in table.rows]
+    verify_login_matrix(rows)
+
+@step("Verify logins from credentials file <file_path>")
+def verify_logins_from_file(file_path):
+    verify_login_matrix(TestData.load_credentials_table(file_path))
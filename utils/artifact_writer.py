@@ -0,0 +1,55 @@
+import os
+import re
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def artifact_file_name(name, extension):
+    """生成唯一的产物文件名: 名称中的特殊字符替换为下划线，并附加微秒级时间戳"""
+    safe_name = re.sub(r'[^\w\-.]+', '_', name).strip('_') or "artifact"
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+    return f"{safe_name}_{timestamp}_{os.getpid()}.{extension}"
+
+
+class ArtifactWriter:
+    """后台产物写入器，在单独的线程中把截图等数据写入磁盘，避免阻塞下一个场景"""
+
+    def __init__(self):
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def _submit(self, func, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+            self._futures = [future for future in self._futures if not future.done()]
+            self._futures.append(self._executor.submit(func, *args))
+
+    def write_bytes(self, path, data):
+        """异步写入二进制数据"""
+        self._submit(self._write_bytes, path, data)
+
+    @staticmethod
+    def _write_bytes(path, data):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(data)
+
+    def flush(self):
+        """等待所有待写入的产物完成"""
+        with self._lock:
+            futures = list(self._futures)
+            self._futures = []
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"写入测试产物失败: {str(e)}")
+
+
+# 全局产物写入器
+artifact_writer = ArtifactWriter()
@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import inspect
+import threading
+
+
+class EventLoopThread:
+    """在后台线程中运行的asyncio事件循环，由BrowserManager持有
+
+    其他线程通过 run() 提交协程并阻塞等待结果，多个线程可以同时提交，
+    协程在同一个事件循环中并发执行。
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="playwright-event-loop", daemon=True)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        """启动事件循环线程"""
+        self.thread.start()
+        return self
+
+    def run(self, coroutine):
+        """在事件循环中执行协程并等待结果"""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("不能在事件循环线程中同步等待协程，请直接使用await")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def stop(self):
+        """停止事件循环并等待线程结束"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.loop.close()
+
+
+def _is_playwright_object(value):
+    """判断是否为需要包装的Playwright API对象"""
+    return type(value).__module__.startswith("playwright.")
+
+
+def unwrap(value):
+    """取出SyncProxy包装的原始async_api对象"""
+    if isinstance(value, SyncProxy):
+        return object.__getattribute__(value, "_target")
+    return value
+
+
+class SyncProxy:
+    """playwright.async_api对象的同步外观
+
+    方法调用返回的协程会提交到事件循环并阻塞等待，返回的Playwright对象继续被包装，
+    因此现有基于同步API编写的BrowserManager、页面对象和Gauge步骤无需修改即可使用异步后端。
+    """
+
+    def __init__(self, target, runner):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_runner", runner)
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if _is_playwright_object(value):
+            return SyncProxy(value, self._runner)
+        return value
+
+    def _adapt_argument(self, value):
+        """解包代理参数；普通回调(如route处理函数)在线程池中以同步方式执行"""
+        if isinstance(value, SyncProxy):
+            return unwrap(value)
+        if callable(value) and not inspect.iscoroutinefunction(value) and not _is_playwright_object(value):
+            callback = value
+
+            # 保留原回调的签名: Playwright按处理函数的参数个数传参(如route处理函数可接收route或route, request)
+            @functools.wraps(callback)
+            async def async_callback(*args):
+                loop = asyncio.get_running_loop()
+                wrapped_args = [self._wrap(arg) for arg in args]
+                return await loop.run_in_executor(None, functools.partial(callback, *wrapped_args))
+            return async_callback
+        return value
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not (inspect.ismethod(value) or inspect.isfunction(value)):
+            return self._wrap(value)
+
+        @functools.wraps(value)
+        def method(*args, **kwargs):
+            args = [self._adapt_argument(arg) for arg in args]
+            kwargs = {key: self._adapt_argument(arg) for key, arg in kwargs.items()}
+            result = value(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = self._runner.run(result)
+            return self._wrap(result)
+        return method
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, unwrap(value))
+
+    def __eq__(self, other):
+        return unwrap(self) == unwrap(other)
+
+    def __hash__(self):
+        return hash(unwrap(self))
+
+    def __repr__(self):
+        return f"SyncProxy({unwrap(self)!r})"
@@ -0,0 +1,47 @@
+import hashlib
+import json
+import os
+import time
+
+
+class AuthStateCache:
+    """登录状态缓存类，将浏览器上下文的storage state(cookies/localStorage)持久化到磁盘
+
+    缓存文件按 用户名+base_url 区分，超过TTL后视为失效。
+    """
+
+    def __init__(self, cache_dir=None, ttl=None):
+        self.cache_dir = cache_dir or os.environ.get("AUTH_STATE_DIR", ".auth")
+        self.ttl = float(ttl if ttl is not None else os.environ.get("AUTH_STATE_TTL", "1800"))
+
+    def get_path(self, username, base_url):
+        """获取指定用户和站点对应的缓存文件路径"""
+        key = hashlib.sha1(f"{username}@{base_url}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"storage_state_{key}.json")
+
+    def get_valid_path(self, username, base_url):
+        """获取未过期的缓存文件路径，不存在或已过期时返回None"""
+        path = self.get_path(username, base_url)
+        if not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.ttl:
+            self.invalidate(username, base_url)
+            return None
+        return path
+
+    def save(self, context, username, base_url):
+        """保存上下文的storage state，先写临时文件再替换以避免并行worker读到半写的文件"""
+        path = self.get_path(username, base_url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(context.storage_state(), file)
+        os.replace(temp_path, path)
+        return path
+
+    def invalidate(self, username, base_url):
+        """删除缓存的登录状态"""
+        try:
+            os.remove(self.get_path(username, base_url))
+        except FileNotFoundError:
+            pass
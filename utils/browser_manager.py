@@ -1,7 +1,68 @@
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 import os
-import datetime
 import platform
+import threading
+from urllib.parse import urlsplit
+from utils.artifact_writer import artifact_writer, artifact_file_name
+from utils.async_engine import EventLoopThread, SyncProxy, unwrap
+from utils.browser_server import read_endpoint
+from utils.network_router import NetworkRouter
+from utils.resource_monitor import ResourceMonitor
+from utils.timing import timed
+
+# 上下文隔离级别: 每个场景/每个规范/整个套件使用一个上下文
+ISOLATION_LEVELS = ("scenario", "spec", "suite")
+
+# 重置复用的上下文时，在每个访问过的源上打开的空白页路径(由路由直接返回，不访问服务器)
+RESET_STORAGE_PATH = "/__reset_storage__"
+
+# 清除当前源的localStorage、sessionStorage、IndexedDB和CacheStorage
+RESET_STORAGE_SCRIPT = """async () => {
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+    } catch (e) {}
+    try {
+        if (window.indexedDB && indexedDB.databases) {
+            for (const db of await indexedDB.databases()) {
+                await new Promise(resolve => {
+                    const request = indexedDB.deleteDatabase(db.name);
+                    request.onsuccess = request.onerror = request.onblocked = resolve;
+                });
+            }
+        }
+    } catch (e) {}
+    try {
+        if (window.caches) {
+            for (const key of await caches.keys()) {
+                await caches.delete(key);
+            }
+        }
+    } catch (e) {}
+}"""
+
+def get_launch_args(browser_name, is_maximized, system=None):
+    """获取浏览器启动参数，system默认为当前操作系统"""
+    system = system or platform.system()
+    browser_args = []
+    if is_maximized:
+        # 添加最大化参数，根据不同系统和浏览器调整
+        if system == "Darwin":  # macOS
+            if browser_name == "chromium":
+                browser_args = ["--start-fullscreen"]
+            # macOS上的Firefox和WebKit需要特殊处理
+        elif system == "Windows":
+            if browser_name == "chromium":
+                browser_args = ["--start-maximized"]
+            elif browser_name == "firefox":
+                browser_args = ["--kiosk"]
+        else:  # Linux和其他系统
+            if browser_name == "chromium":
+                browser_args = ["--start-maximized"]
+            elif browser_name == "firefox":
+                browser_args = ["--kiosk"]
+    return browser_args
 
 class BrowserManager:
     """浏览器管理器类，负责管理Playwright浏览器实例"""
@@ -12,11 +73,26 @@ class BrowserManager:
         self.context = None
         self.page = None
         self.system = platform.system()  # 获取操作系统类型
+        self.window_size = None  # 每次启动浏览器时计算一次的目标窗口尺寸
+        self.network_router = NetworkRouter()  # 所有上下文共享的请求拦截和响应缓存
+        self.scenario_name = "scenario"  # 当前场景名称，用于命名跟踪文件和截图
+        self.tracing = False
+        self.prewarmed_contexts = []  # 预热的(context, page)池
+        self._prewarm_thread = None  # 在后台补充预热池的线程
+        self._prewarm_lock = threading.Lock()
+        self._prewarm_stopping = False  # 浏览器关闭时通知后台预热线程停止
+        self.context_scope = None  # 当前上下文的隔离级别
+        self.context_failed = False  # 复用的上下文中是否有场景失败
+        self.visited_origins = set()  # 复用的上下文中访问过的源，重置时逐个清除存储
+        self.event_loop = None  # 异步引擎的事件循环线程
+        self.resource_monitor = ResourceMonitor()  # 浏览器进程资源监控，跨浏览器回收保留数据
+        self.scenario_count = 0  # 本次启动浏览器后运行的场景数量
     
     def get_env_var(self, var_name, default_value):
         """从环境变量获取配置"""
         return os.environ.get(var_name, default_value)
     
+    @timed("browser.start")
     def start(self):
         """启动浏览器"""
         # 获取浏览器配置
@@ -26,29 +102,25 @@ class BrowserManager:
         is_maximized = self.get_env_var("MAXIMIZED", "true").lower() == "true"
         
         # 初始化 Playwright
-        self.playwright = sync_playwright().start()
+        if self.is_async_engine():
+            # 异步引擎: 事件循环由管理器持有，对外通过同步外观提供与同步API相同的接口
+            self.event_loop = EventLoopThread().start()
+            self.playwright = SyncProxy(self.event_loop.run(async_playwright().start()), self.event_loop)
+        else:
+            self.playwright = sync_playwright().start()
         
         # 准备浏览器启动参数
-        browser_args = []
-        if is_maximized:
-            # 添加最大化参数，根据不同系统和浏览器调整
-            if self.system == "Darwin":  # macOS
-                if browser_name == "chromium":
-                    browser_args = ["--start-fullscreen"]
-                # macOS上的Firefox和WebKit需要特殊处理
-            elif self.system == "Windows":
-                if browser_name == "chromium":
-                    browser_args = ["--start-maximized"]
-                elif browser_name == "firefox":
-                    browser_args = ["--kiosk"]
-            else:  # Linux和其他系统
-                if browser_name == "chromium":
-                    browser_args = ["--start-maximized"]
-                elif browser_name == "firefox":
-                    browser_args = ["--kiosk"]
+        browser_args = get_launch_args(browser_name, is_maximized, self.system)
         
         # 根据配置启动相应的浏览器
-        if browser_name == "firefox":
+        if self.get_env_var("BROWSER_SERVER", "off").lower() == "connect":
+            # 共享浏览器服务器模式: 连接到已启动的浏览器服务器，多个worker共用一个浏览器进程
+            endpoint = read_endpoint()
+            if not endpoint:
+                raise RuntimeError("BROWSER_SERVER=connect 需要设置BROWSER_WS_ENDPOINT或先运行 python -m utils.browser_server start")
+            browser_type = getattr(self.playwright, browser_name if browser_name in ("firefox", "webkit") else "chromium")
+            self.browser = browser_type.connect(endpoint, slow_mo=slow_mo)
+        elif browser_name == "firefox":
             self.browser = self.playwright.firefox.launch(
                 headless=headless,
                 slow_mo=slow_mo,
@@ -66,26 +138,121 @@ class BrowserManager:
                 args=browser_args
             )
         
+        # 快速启动模式下只在启动时计算一次最大化尺寸，之后直接用于上下文选项
+        self.window_size = None
+        if is_maximized and self._is_fast_start():
+            self.window_size = self._detect_window_size()
+        
+        # 开始采样浏览器进程的CPU和内存
+        self.scenario_count = 0
+        is_connected = self.get_env_var("BROWSER_SERVER", "off").lower() == "connect"
+        self.resource_monitor.start(self._driver_pid(), browser_local=not is_connected)
+        
+        # 预先创建上下文，第一个场景即可直接使用
+        self.prewarm_contexts()
+        
         print(f"启动浏览器: {browser_name}, 系统: {self.system}, 无头模式: {headless}, 慢速模式: {slow_mo}ms, 最大化: {is_maximized}")
     
+    def is_async_engine(self):
+        """是否使用基于asyncio的Playwright引擎(ENGINE=async)"""
+        return self.get_env_var("ENGINE", "sync").lower() == "async"
+    
+    def run_async(self, coroutine_function, *args):
+        """在管理器的事件循环中执行协程函数并返回结果
+        
+        协程函数接收原始的async_api浏览器对象作为第一个参数，可以在其中并发驱动多个上下文和页面，例如:
+            manager.run_async(check_logins, rows)  # async def check_logins(browser, rows): ...
+        """
+        if not self.event_loop:
+            raise RuntimeError("run_async需要异步引擎，请设置ENGINE=async")
+        return self.event_loop.run(coroutine_function(unwrap(self.browser), *args))
+    
+    def _driver_pid(self):
+        """本管理器的Playwright驱动进程号，它启动的浏览器进程都是它的子孙进程
+        
+        同一进程中的多个管理器(多线程worker)各自拥有驱动进程，因此只统计自己的浏览器。
+        Playwright没有公开驱动进程，读取失败时返回None(只记录上下文和页面数量)
+        """
+        try:
+            return unwrap(self.playwright)._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            return None
+    
+    def _is_fast_start(self):
+        """是否启用快速启动模式"""
+        return self.get_env_var("FAST_START", "true").lower() == "true"
+    
+    def _detect_window_size(self):
+        """通过临时页面读取屏幕可用尺寸，计算最大化时的视口大小"""
+        page = self.browser.new_page()
+        try:
+            screen_size = page.evaluate("""() => {
+                return {
+                    width: window.screen.availWidth,
+                    height: window.screen.availHeight
+                }
+            }""")
+        finally:
+            page.close()
+        
+        # 与窗口最大化方法保持一致，预留菜单栏/工具栏的高度
+        toolbar_height = 30 if self.system == "Darwin" else 50
+        return {
+            'width': screen_size['width'],
+            'height': max(screen_size['height'] - toolbar_height, 1)
+        }
+    
     def stop(self):
         """停止浏览器"""
+        # 关闭仍在复用的上下文，以便按失败状态保存跟踪文件
+        if self.context:
+            self.close_context()
+        # 等待后台预热线程结束，避免关闭浏览器时仍在创建上下文
+        self._prewarm_stopping = True
+        self.wait_for_prewarm()
+        self._prewarm_stopping = False
+        for context, _ in self.prewarmed_contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self.prewarmed_contexts = []
         if self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
+        if self.event_loop:
+            self.event_loop.stop()
+        self.resource_monitor.stop()
+        self.browser = None
+        self.playwright = None
+        self.event_loop = None
+        self.context = None
+        self.page = None
     
-    def create_context(self):
-        """创建浏览器上下文和页面"""
+    def _open_context(self, storage_state=None):
+        """创建并初始化一个新的浏览器上下文和页面，返回(context, page)"""
         # 判断是否需要最大化
         is_maximized = self.get_env_var("MAXIMIZED", "true").lower() == "true"
         
+        # 所有上下文通用的选项
+        context_options = {"accept_downloads": True}
+        if storage_state:
+            context_options["storage_state"] = storage_state
+        
         # 创建上下文
-        if is_maximized:
+        if is_maximized and self.window_size:
+            # 快速启动模式: 直接使用缓存的最大化尺寸，无需在页面中调整窗口
+            context = self.browser.new_context(
+                viewport=self.window_size,
+                screen=self.window_size,
+                **context_options
+            )
+        elif is_maximized:
             # 为最大化情况创建上下文
-            self.context = self.browser.new_context(
+            context = self.browser.new_context(
                 no_viewport=True,  # 禁用固定视口
-                accept_downloads=True
+                **context_options
             )
         else:
             # 浏览器设置
@@ -93,31 +260,124 @@ class BrowserManager:
             viewport_height = int(self.get_env_var("VIEWPORT_HEIGHT", "720"))
             
             # 为每个场景创建新的浏览器上下文
-            self.context = self.browser.new_context(
+            context = self.browser.new_context(
                 viewport={"width": viewport_width, "height": viewport_height},
-                accept_downloads=True
+                **context_options
             )
         
+        # 安装请求拦截和静态资源缓存
+        self.network_router.install(context)
+        
         # 创建新页面
-        self.page = self.context.new_page()
+        page = context.new_page()
+        
+        # 如果是最大化模式且未使用快速启动，使用多种方法确保窗口最大化
+        if is_maximized and not self.window_size:
+            self._maximize_page(page)
         
-        # 如果是最大化模式，使用多种方法确保窗口最大化
-        if is_maximized:
+        return context, page
+    
+    def _maximize_page(self, page):
+        """对指定页面执行窗口最大化(非快速启动模式)"""
+        current_page = self.page
+        self.page = page
+        try:
             # 导航到一个页面，有助于最大化命令执行
             self.page.goto("about:blank")
             self._maximize_window()
-            # 等待一小段时间让最大化生效
-            self.page.wait_for_timeout(1000)
-            # 检查窗口尺寸以确认最大化是否成功
+            # 等待窗口尺寸接近屏幕可用尺寸，而不是固定等待
+            self._wait_for_maximized()
+        finally:
+            self.page = current_page
+    
+    @timed("browser.create_context")
+    def create_context(self, storage_state=None):
+        """创建浏览器上下文和页面
+        
+        优先使用预热池中的上下文，池为空或需要storage_state时按需创建。
+        storage_state: 可选的storage state文件路径或字典，用于以已登录状态初始化上下文
+        """
+        prewarmed = None if storage_state else self._take_prewarmed_context()
+        self.context, self.page = prewarmed or self._open_context(storage_state)
+        if prewarmed:
+            # 立即在后台补充取走的上下文，与当前场景并发创建，下一个场景开始前即可就绪
+            self.prewarm_contexts()
+        
+        # 仅在显式要求时检查窗口尺寸，避免每个场景的额外开销
+        is_maximized = self.get_env_var("MAXIMIZED", "true").lower() == "true"
+        if is_maximized and self.get_env_var("CHECK_WINDOW_SIZE", "false").lower() == "true":
             self._check_window_size()
         
         # 开启跟踪日志（可选）
-        if self.get_env_var("TRACE", "false").lower() == "true":
+        self.tracing = self.get_trace_mode() != "off"
+        if self.tracing:
             self.context.tracing.start(screenshots=True, snapshots=True)
         
         # 使页面全局可用
         os.environ["playwright_page"] = "initialized"
     
+    def prewarm_contexts(self):
+        """在后台线程中将预热上下文池补充到CONTEXT_POOL_SIZE个，不阻塞当前场景
+        
+        需要异步引擎: 同步API只能在创建它的线程中使用，在场景线程中补充只是把创建上下文的耗时
+        从before_scenario移到after_scenario。异步引擎下后台线程通过事件循环创建上下文，
+        与场景的步骤并发执行。传统最大化方式(FAST_START=false)需要在页面中调整窗口，不预热。
+        """
+        pool_size = int(self.get_env_var("CONTEXT_POOL_SIZE", "0"))
+        if pool_size <= 0 or not self.browser or not self.is_async_engine():
+            return
+        is_maximized = self.get_env_var("MAXIMIZED", "true").lower() == "true"
+        if is_maximized and not self.window_size:
+            return
+        if self._prewarm_thread and self._prewarm_thread.is_alive():
+            return
+        self._prewarm_thread = threading.Thread(
+            target=self._fill_pool, args=(pool_size,), name="context-prewarm", daemon=True)
+        self._prewarm_thread.start()
+    
+    @timed("browser.prewarm_contexts")
+    def _fill_pool(self, pool_size):
+        """后台线程: 创建上下文直到池满或浏览器开始关闭"""
+        while self.browser and not self._prewarm_stopping:
+            with self._prewarm_lock:
+                if len(self.prewarmed_contexts) >= pool_size:
+                    return
+            try:
+                prewarmed = self._open_context()
+            except Exception as e:
+                print(f"预热上下文失败: {str(e)}")
+                return
+            with self._prewarm_lock:
+                self.prewarmed_contexts.append(prewarmed)
+    
+    def wait_for_prewarm(self):
+        """等待正在进行的后台预热完成"""
+        if self._prewarm_thread:
+            self._prewarm_thread.join()
+            self._prewarm_thread = None
+    
+    def _take_prewarmed_context(self):
+        """从预热池中取出一个可用的上下文，池为空时返回None(不等待正在创建的上下文)"""
+        while True:
+            with self._prewarm_lock:
+                if not self.prewarmed_contexts:
+                    return None
+                context, page = self.prewarmed_contexts.pop(0)
+            if self._is_clean_context(context, page):
+                return context, page
+            # 页面已关闭的上下文直接丢弃
+            context.close()
+    
+    def _is_clean_context(self, context, page):
+        """检查预热上下文仍然可用: 只有一个未关闭的页面
+        
+        池中的上下文在取出前不会交给步骤使用，只检查本地状态，不增加浏览器往返
+        """
+        try:
+            return not page.is_closed() and len(context.pages) == 1
+        except Exception:
+            return False
+    
     def _maximize_window(self):
         """使用多种方法尝试最大化窗口"""
         if self.page:
@@ -205,6 +465,18 @@ class BrowserManager:
             }
         }""")
     
+    def _wait_for_maximized(self, timeout=1000):
+        """等待最大化生效，窗口面积达到屏幕可用面积的90%或超时即返回"""
+        try:
+            self.page.wait_for_function("""() => {
+                const screenArea = window.screen.availWidth * window.screen.availHeight;
+                const windowArea = window.innerWidth * window.innerHeight;
+                return screenArea > 0 && windowArea / screenArea > 0.9;
+            }""", timeout=timeout)
+        except Exception:
+            # 部分平台(如无头模式)窗口无法达到屏幕尺寸，直接继续
+            pass
+    
     def _check_window_size(self):
         """检查并显示当前窗口尺寸"""
         try:
@@ -251,27 +523,206 @@ class BrowserManager:
         except Exception as e:
             print(f"检查窗口尺寸时出错: {str(e)}")
     
-    def close_context(self):
-        """关闭浏览器上下文"""
-        # 停止跟踪日志（如果启用）
-        if self.get_env_var("TRACE", "false").lower() == "true":
-            self.context.tracing.stop(path="trace.zip")
+    @timed("browser.begin_scenario")
+    def begin_scenario(self, isolation="scenario"):
+        """场景开始时准备上下文
         
-        # 每个场景后关闭上下文
+        isolation为spec/suite时复用同一级别的现有上下文并重置其状态，
+        否则关闭遗留的上下文并创建新的上下文。
+        """
+        if isolation not in ISOLATION_LEVELS:
+            raise ValueError(f"不支持的隔离级别: {isolation}，可选值: {ISOLATION_LEVELS}")
+        
+        if self.context and isolation != "scenario" and self.context_scope == isolation:
+            self.reset_context()
+        else:
+            if self.context:
+                self.close_context()
+            self.create_context()
+            self.context_scope = isolation
+            if isolation != "scenario":
+                self._track_origins()
+        self.resource_monitor.begin_scenario(self.scenario_name, *self.count_open())
+    
+    def end_scenario(self, failed=False):
+        """场景结束时按隔离级别关闭或保留上下文，检查泄漏的上下文，并在达到阈值时回收浏览器"""
+        try:
+            if self.context_scope == "scenario":
+                self.close_context(failed=failed)
+            else:
+                # 复用的上下文在关闭时按是否有场景失败决定是否保存跟踪文件
+                self.context_failed = self.context_failed or failed
+        finally:
+            # 即使关闭上下文出错也要检查泄漏，避免上下文在后续场景中累积
+            self.close_leaked_contexts()
+            self.resource_monitor.end_scenario(*self.count_open())
+        
+        self.scenario_count += 1
+        # 只在没有复用中的上下文时回收，spec/suite级别的上下文会在规范结束后回收
+        reason = self.resource_monitor.should_recycle(self.scenario_count)
+        if reason and not self.context:
+            self.recycle(reason)
+    
+    def count_open(self):
+        """当前浏览器中打开的上下文和页面数量"""
+        if not self.browser:
+            return 0, 0
+        try:
+            contexts = self.browser.contexts
+            return len(contexts), sum(len(context.pages) for context in contexts)
+        except Exception:
+            return 0, 0
+    
+    def close_leaked_contexts(self):
+        """关闭不属于管理器(当前上下文和预热池)的上下文，例如close_context出错时遗留的上下文"""
+        if not self.browser:
+            return
+        # 后台正在创建的上下文还未加入预热池，无法区分是否泄漏，留到下一个场景结束时检查，
+        # 不在场景线程中等待预热完成
+        if self._prewarm_thread and self._prewarm_thread.is_alive():
+            return
+        with self._prewarm_lock:
+            owned = [context for context, _ in self.prewarmed_contexts]
         if self.context:
-            self.context.close()
+            owned.append(self.context)
+        leaked = [context for context in self.browser.contexts if context not in owned]
+        if not leaked:
+            return
+        pages = 0
+        for context in leaked:
+            try:
+                pages += len(context.pages)
+                context.close()
+            except Exception:
+                pass
+        self.resource_monitor.record_leak(self.scenario_name, len(leaked), pages)
+    
+    @timed("browser.recycle")
+    def recycle(self, reason):
+        """重启浏览器以释放长时间运行积累的内存"""
+        self.resource_monitor.record_recycle(reason)
+        self.stop()
+        self.start()
+    
+    def end_spec(self):
+        """规范结束时关闭规范级别复用的上下文"""
+        if self.context and self.context_scope == "spec":
+            self.close_context()
+            reason = self.resource_monitor.should_recycle(self.scenario_count)
+            if reason:
+                self.recycle(reason)
+    
+    def _track_origins(self):
+        """记录复用的上下文中所有页面(包括新打开的页面)导航到的源"""
+        self.visited_origins = set()
+        
+        def record(frame):
+            parts = urlsplit(frame.url)
+            if parts.scheme in ("http", "https"):
+                self.visited_origins.add(f"{parts.scheme}://{parts.netloc}")
+        
+        def watch(page):
+            page.on("framenavigated", record)
+        
+        for page in self.context.pages:
+            watch(page)
+        self.context.on("page", watch)
+    
+    @timed("browser.reset_context")
+    def reset_context(self):
+        """重置复用的上下文: 关闭多余页面，清除cookie、权限以及所有访问过的源的存储，并回到空白页
+        
+        存储只能在对应源的页面中清除，因此对每个访问过的源打开一个由路由直接返回的空白页，
+        在其中清除localStorage、sessionStorage、IndexedDB和CacheStorage。
+        """
+        for page in self.context.pages:
+            if page != self.page:
+                page.close()
+        
+        origins = sorted(self.visited_origins)
+        if origins:
+            pattern = f"**{RESET_STORAGE_PATH}"
+            self.context.route(pattern, lambda route: route.fulfill(
+                status=200, content_type="text/html", body="<html></html>"))
+            try:
+                for origin in origins:
+                    try:
+                        self.page.goto(origin + RESET_STORAGE_PATH, wait_until="domcontentloaded")
+                        self.page.evaluate(RESET_STORAGE_SCRIPT)
+                    except Exception as e:
+                        print(f"清除 {origin} 的存储时出错: {str(e)}")
+            finally:
+                self.context.unroute(pattern)
+        # 清除过程中的导航也会被记录，全部清除后重新开始记录
+        self.visited_origins = set()
+        
+        self.context.clear_cookies()
+        self.context.clear_permissions()
+        self.page.goto("about:blank")
+    
+    def get_trace_mode(self):
+        """获取跟踪模式: off / on / retain-on-failure
+        
+        未设置TRACE_MODE时兼容旧的TRACE=true配置(等同于on)
+        """
+        trace_mode = self.get_env_var("TRACE_MODE", "").lower()
+        if trace_mode:
+            return trace_mode
+        return "on" if self.get_env_var("TRACE", "false").lower() == "true" else "off"
+    
+    @timed("browser.close_context")
+    def close_context(self, failed=False):
+        """关闭浏览器上下文
+        
+        failed: 场景是否失败，retain-on-failure模式下只保存失败场景的跟踪文件
+        """
+        if not self.context:
+            return
+        
+        failed = failed or self.context_failed
+        try:
+            # 停止跟踪日志（如果启用）
+            if self.tracing:
+                if failed or self.get_trace_mode() == "on":
+                    trace_dir = self.get_env_var("TRACE_DIR", os.path.join("artifacts", "traces"))
+                    os.makedirs(trace_dir, exist_ok=True)
+                    trace_path = os.path.join(trace_dir, artifact_file_name(self.scenario_name, "zip"))
+                    self.context.tracing.stop(path=trace_path)
+                    print(f"跟踪文件已保存: {trace_path}")
+                else:
+                    # 场景通过，丢弃内存中的跟踪数据
+                    self.context.tracing.stop()
+        finally:
+            # 每个场景后关闭上下文，即使停止跟踪失败也要关闭
+            # 先清除引用再关闭，关闭失败时遗留的上下文由close_leaked_contexts处理
+            context = self.context
+            self.tracing = False
+            self.context_failed = False
+            self.context = None
+            self.page = None
+            context.close()
     
     def take_screenshot(self):
-        """截取当前页面的屏幕截图"""
+        """截取当前页面的屏幕截图
+        
+        返回截图字节供Gauge的@screenshot钩子直接使用，screenshots/下的副本交给后台线程写入，
+        没有页面时返回空字节
+        """
         if self.page:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            screenshot_dir = "screenshots"
-            if not os.path.exists(screenshot_dir):
-                os.makedirs(screenshot_dir)
-            screenshot_path = os.path.join(screenshot_dir, f"screenshot_{timestamp}.png")
-            self.page.screenshot(path=screenshot_path, full_page=True)
-            return screenshot_path
-        return ""
+            screenshot_type = self.get_env_var("SCREENSHOT_TYPE", "jpeg").lower()
+            options = {
+                "type": screenshot_type,
+                "full_page": self.get_env_var("SCREENSHOT_FULL_PAGE", "false").lower() == "true"
+            }
+            if screenshot_type == "jpeg":
+                options["quality"] = int(self.get_env_var("SCREENSHOT_QUALITY", "80"))
+            
+            extension = "jpg" if screenshot_type == "jpeg" else "png"
+            screenshot_path = os.path.join("screenshots", artifact_file_name(self.scenario_name, extension))
+            screenshot = self.page.screenshot(**options)
+            artifact_writer.write_bytes(screenshot_path, screenshot)
+            return screenshot
+        return b""
     
     def get_page(self):
         """获取当前页面实例"""
@@ -0,0 +1,123 @@
+import os
+import threading
+
+from utils.browser_manager import BrowserManager
+
+
+def get_worker_id():
+    """获取当前执行worker的标识
+
+    Gauge并行执行(`gauge run -p`/`--n`)时会为每个执行流设置
+    GAUGE_PARALLEL_STREAM_ID 环境变量；启用多线程执行时同一进程内
+    会有多个线程，此时再附加线程名加以区分。
+    """
+    stream_id = os.environ.get("GAUGE_PARALLEL_STREAM_ID", "0")
+    thread = threading.current_thread()
+    if thread is threading.main_thread():
+        return stream_id
+    return f"{stream_id}-{thread.name}"
+
+
+class BrowserPool:
+    """按worker管理BrowserManager实例的浏览器池
+
+    每个worker(进程或线程)拥有独立的Playwright实例和浏览器，
+    create_context/close_context/get_page都会路由到当前worker的管理器。
+    Playwright同步API只能在创建它的线程中使用，因此浏览器在worker
+    第一次使用时才启动。
+    """
+
+    def __init__(self, manager_factory=BrowserManager):
+        self.manager_factory = manager_factory
+        self.managers = {}
+        self._lock = threading.Lock()
+
+    def get_manager(self):
+        """获取当前worker的浏览器管理器，如未启动则启动浏览器"""
+        worker_id = get_worker_id()
+        with self._lock:
+            manager = self.managers.get(worker_id)
+            if manager is None:
+                manager = self.manager_factory()
+                self.managers[worker_id] = manager
+        if manager.browser is None:
+            manager.start()
+        return manager
+
+    def start(self):
+        """为当前worker启动浏览器"""
+        return self.get_manager()
+
+    def stop(self):
+        """停止当前worker的浏览器"""
+        with self._lock:
+            manager = self.managers.pop(get_worker_id(), None)
+        if manager:
+            manager.stop()
+
+    def stop_all(self):
+        """停止池中所有worker的浏览器"""
+        with self._lock:
+            managers = list(self.managers.items())
+            self.managers.clear()
+        for worker_id, manager in managers:
+            try:
+                manager.stop()
+            except Exception as e:
+                print(f"停止worker {worker_id} 的浏览器时出错: {str(e)}")
+
+    def report_network_stats(self):
+        """输出每个worker的网络路由统计"""
+        for worker_id, manager in list(self.managers.items()):
+            if manager.network_router.enabled:
+                print(f"[worker {worker_id}]", end=" ")
+                manager.network_router.report()
+
+    def report_resources(self):
+        """写入每个worker的浏览器资源报告并输出汇总"""
+        for worker_id, manager in list(self.managers.items()):
+            path = manager.resource_monitor.write_report(worker_id)
+            if path:
+                print(f"[worker {worker_id}] 资源报告已写入: {path}")
+                manager.resource_monitor.print_summary()
+
+    def create_context(self, storage_state=None):
+        """为当前worker创建浏览器上下文和页面"""
+        self.get_manager().create_context(storage_state=storage_state)
+
+    def begin_scenario(self, isolation="scenario"):
+        """场景开始时按隔离级别为当前worker准备上下文"""
+        self.get_manager().begin_scenario(isolation)
+
+    def end_scenario(self, failed=False):
+        """场景结束时按隔离级别关闭或保留当前worker的上下文"""
+        manager = self.managers.get(get_worker_id())
+        if manager:
+            manager.end_scenario(failed=failed)
+
+    def end_spec(self):
+        """规范结束时关闭当前worker规范级别的上下文"""
+        manager = self.managers.get(get_worker_id())
+        if manager:
+            manager.end_spec()
+
+    def close_context(self, failed=False):
+        """关闭当前worker的浏览器上下文"""
+        manager = self.managers.get(get_worker_id())
+        if manager:
+            manager.close_context(failed=failed)
+
+    def prewarm_contexts(self):
+        """为当前worker补充预热上下文池"""
+        manager = self.managers.get(get_worker_id())
+        if manager:
+            manager.prewarm_contexts()
+
+    def take_screenshot(self):
+        """截取当前worker页面的屏幕截图"""
+        manager = self.managers.get(get_worker_id())
+        return manager.take_screenshot() if manager else b""
+
+    def get_page(self):
+        """获取当前worker的页面实例"""
+        return self.get_manager().get_page()
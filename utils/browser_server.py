@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+
+try:
+    import psutil
+except ImportError:  # psutil是可选依赖
+    psutil = None
+
+# 共享浏览器服务器的状态文件，记录websocket地址和进程号
+STATE_FILE = os.environ.get("BROWSER_SERVER_STATE", os.path.join(".cache", "browser_server.json"))
+
+
+def read_endpoint():
+    """获取共享浏览器服务器的websocket地址: BROWSER_WS_ENDPOINT环境变量 > 状态文件"""
+    endpoint = os.environ.get("BROWSER_WS_ENDPOINT")
+    if endpoint:
+        return endpoint
+    state = read_state()
+    return state.get("endpoint") if state else None
+
+
+def _pid_exists(pid):
+    """检查进程是否存在
+
+    Windows上os.kill(pid, 0)会调用TerminateProcess结束进程，因此优先使用psutil，
+    没有psutil时在Windows上通过OpenProcess查询退出码
+    """
+    if psutil:
+        return psutil.pid_exists(pid)
+    if os.name == "nt":
+        import ctypes
+        process_query_limited_information = 0x1000
+        still_active = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(process_query_limited_information, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))) and exit_code.value == still_active
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def read_state():
+    """读取状态文件，服务器进程已退出时返回None"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if "pid" not in state or not _pid_exists(state["pid"]):
+        return None
+    return state
+
+
+def launch_server(browser_name="chromium", headless=True, args=None, timeout=60):
+    """启动Playwright浏览器服务器进程，返回(进程, websocket地址)
+
+    Python版Playwright没有launch_server接口，这里调用随包附带的驱动的 launch-server 命令，
+    它会启动浏览器并在标准输出打印websocket地址。
+    """
+    config = {"headless": headless}
+    if args:
+        config["args"] = args
+    config_file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    with config_file:
+        json.dump(config, config_file)
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "playwright", "launch-server", "--browser", browser_name, "--config", config_file.name],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        start_new_session=True
+    )
+
+    # 等待服务器输出websocket地址
+    lines = []
+    reader = threading.Thread(target=lambda: lines.append(process.stdout.readline()), daemon=True)
+    reader.start()
+    reader.join(timeout)
+    os.remove(config_file.name)
+    endpoint = lines[0].strip() if lines else ""
+    if not endpoint.startswith("ws"):
+        process.kill()
+        raise RuntimeError(f"浏览器服务器启动失败: {endpoint or '等待websocket地址超时'}")
+    return process, endpoint
+
+
+def start(browser_name, headless, args=None):
+    """在后台启动共享浏览器服务器并写入状态文件"""
+    state = read_state()
+    if state:
+        print(f"浏览器服务器已在运行: {state['endpoint']} (pid {state['pid']})")
+        return state["endpoint"]
+
+    process, endpoint = launch_server(browser_name, headless, args)
+    directory = os.path.dirname(STATE_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as file:
+        json.dump({"endpoint": endpoint, "pid": process.pid, "browser": browser_name}, file)
+    print(f"浏览器服务器已启动: {endpoint} (pid {process.pid})")
+    return endpoint
+
+
+def stop():
+    """停止共享浏览器服务器并删除状态文件"""
+    state = read_state()
+    if state:
+        try:
+            os.killpg(state["pid"], signal.SIGTERM)
+        except (OSError, AttributeError):
+            os.kill(state["pid"], signal.SIGTERM)
+        print(f"浏览器服务器已停止 (pid {state['pid']})")
+    try:
+        os.remove(STATE_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="管理多个Gauge执行流共享的浏览器服务器")
+    parser.add_argument("action", choices=["start", "stop", "endpoint"])
+    parser.add_argument("--browser", default=os.environ.get("BROWSER", "chromium").lower())
+    parser.add_argument("--headed", action="store_true", help="以有界面模式启动(默认读取HEADLESS，未设置时无头)")
+    args = parser.parse_args()
+
+    if args.action == "start":
+        from utils.browser_manager import get_launch_args
+        headless = not args.headed and os.environ.get("HEADLESS", "true").lower() == "true"
+        is_maximized = os.environ.get("MAXIMIZED", "true").lower() == "true"
+        start(args.browser, headless, get_launch_args(args.browser, is_maximized))
+    elif args.action == "stop":
+        stop()
+    else:
+        print(read_endpoint() or "")
+
+
+if __name__ == "__main__":
+    main()
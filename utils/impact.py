@@ -0,0 +1,323 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+
+from utils.spec_index import load_scenarios, normalize_step, relative_path, scenario_key, scenario_selector
+from utils.test_data import PROJECT_ROOT, registry
+
+# 修改后影响所有场景的文件
+GLOBAL_FILES = ("requirements.txt", "manifest.json", "step_impl/hooks.py", "step_impl/__init__.py")
+GLOBAL_PREFIXES = ("env/",)
+
+# TestData方法与其读取的数据文件
+DATA_ACCESSORS = {
+    "get_login_credentials": ["test_data/credentials.json"],
+    "get_test_urls": ["test_data/urls.json"],
+    "lazy_url": ["test_data/urls.json"],
+}
+
+# 运行时覆盖率文件
+COVERAGE_PATTERN = os.path.join(".cache", "impact_coverage.{worker}.json")
+
+
+def _module_file(module_name):
+    """将项目内的模块名解析为相对路径，非项目模块返回None"""
+    base = os.path.join(PROJECT_ROOT, *module_name.split("."))
+    for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.exists(candidate):
+            return relative_path(candidate)
+    return None
+
+
+class StaticIndex:
+    """通过静态分析建立 步骤 -> 步骤实现 -> 页面类/定位器/工具模块 -> 测试数据文件 的依赖索引"""
+
+    def __init__(self):
+        self.trees = {}
+        for pattern in ("step_impl/*.py", "pages/*.py", "utils/*.py"):
+            for path in glob.glob(os.path.join(PROJECT_ROOT, pattern)):
+                with open(path, 'r', encoding='utf-8') as file:
+                    self.trees[relative_path(path)] = ast.parse(file.read(), path)
+        self.imports = {path: self._imports(tree) for path, tree in self.trees.items()}
+        self.classes = self._page_classes()
+        self.steps = self._steps()
+
+    def _imports(self, tree):
+        """模块中导入的名字 -> 定义该名字的项目文件"""
+        names = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                module_file = _module_file(node.module)
+                for alias in node.names:
+                    target = _module_file(f"{node.module}.{alias.name}") or module_file
+                    if target:
+                        names[alias.asname or alias.name] = target
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    target = _module_file(alias.name)
+                    if target:
+                        names[alias.asname or alias.name] = target
+        return names
+
+    def module_closure(self, path, seen=None):
+        """文件及其传递导入的所有项目文件"""
+        seen = seen if seen is not None else set()
+        if path in seen:
+            return seen
+        seen.add(path)
+        for target in self.imports.get(path, {}).values():
+            self.module_closure(target, seen)
+        return seen
+
+    def _page_classes(self):
+        """页面类 -> 文件、基类文件、定位器常量和读取的数据文件"""
+        classes = {}
+        for path, tree in self.trees.items():
+            if not path.startswith("pages/"):
+                continue
+            for node in tree.body:
+                if not isinstance(node, ast.ClassDef):
+                    continue
+                locators = [target.id for item in node.body if isinstance(item, ast.Assign)
+                            for target in item.targets if isinstance(target, ast.Name) and target.id.isupper()]
+                bases = [self.imports[path].get(base.id) for base in node.bases if isinstance(base, ast.Name)]
+                classes[node.name] = {
+                    "file": path,
+                    "bases": [base for base in bases if base],
+                    "locators": locators,
+                    "data": sorted(self._data_files(node))
+                }
+        return classes
+
+    def _data_files(self, node):
+        files = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Attribute) and child.attr in DATA_ACCESSORS:
+                files.update(DATA_ACCESSORS[child.attr])
+        return files
+
+    def _steps(self):
+        """规范化的步骤文本 -> 步骤实现及其依赖"""
+        steps = {}
+        for path, tree in self.trees.items():
+            if not path.startswith("step_impl/"):
+                continue
+            functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+            for function in functions.values():
+                for decorator in function.decorator_list:
+                    if (isinstance(decorator, ast.Call) and getattr(decorator.func, "id", None) == "step"
+                            and decorator.args and isinstance(decorator.args[0], ast.Constant)):
+                        steps[normalize_step(decorator.args[0].value)] = self._step_dependencies(path, function, functions)
+        return steps
+
+    def _step_dependencies(self, path, function, functions):
+        """收集步骤函数(以及它调用的同模块辅助函数)用到的页面类、定位器、项目文件和数据文件"""
+        names, attributes = set(), set()
+        pending, visited = [function], set()
+        while pending:
+            node = pending.pop()
+            if node.name in visited:
+                continue
+            visited.add(node.name)
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    names.add(child.id)
+                    if child.id in functions:
+                        pending.append(functions[child.id])
+                elif isinstance(child, ast.Attribute):
+                    attributes.add(child.attr)
+
+        files = {path}
+        pages, data = set(), set()
+        for name in names:
+            target = self.imports[path].get(name)
+            if target:
+                files.update(self.module_closure(target))
+            if name in self.classes:
+                pages.add(name)
+        for attribute in attributes:
+            data.update(DATA_ACCESSORS.get(attribute, []))
+        for file in list(files):
+            for page_name, page in self.classes.items():
+                if page["file"] == file:
+                    pages.add(page_name)
+        for page_name in pages:
+            data.update(self.classes[page_name]["data"])
+        locators = sorted(f"{page_name}.{locator}" for page_name in pages
+                          for locator in self.classes[page_name]["locators"] if locator in attributes)
+        return {
+            "file": path,
+            "function": function.name,
+            "pages": sorted(pages),
+            "locators": locators,
+            "files": sorted(files),
+            "data": sorted(data)
+        }
+
+
+class RuntimeCoverage:
+    """运行时记录每个场景实际执行到的项目Python文件和读取的测试数据文件(IMPACT_RECORD=true)"""
+
+    def __init__(self):
+        self.enabled = os.environ.get("IMPACT_RECORD", "false").lower() == "true"
+        self.coverage = {}
+        self.current = None
+        self._lock = threading.Lock()
+
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            filename = frame.f_code.co_filename
+            if filename.startswith(PROJECT_ROOT) and self.current is not None:
+                self.current.add(filename)
+
+    def start(self):
+        """场景开始时开始记录"""
+        if not self.enabled:
+            return
+        self.current = set()
+        registry.access_listener = self.touch
+        sys.setprofile(self._profile)
+        threading.setprofile(self._profile)
+
+    def touch(self, path):
+        """记录读取的数据文件"""
+        if self.current is not None:
+            self.current.add(path)
+
+    def stop(self, spec_file, scenario_name):
+        """场景结束时停止记录并保存该场景的依赖文件"""
+        if not self.enabled or self.current is None:
+            return
+        sys.setprofile(None)
+        threading.setprofile(None)
+        registry.access_listener = None
+        files = sorted({relative_path(path) for path in self.current})
+        self.current = None
+        with self._lock:
+            self.coverage[scenario_key(relative_path(spec_file), scenario_name)] = files
+
+    def save(self, worker_id="0"):
+        """将本worker记录的覆盖率合并写入文件"""
+        if not self.coverage:
+            return
+        path = os.path.join(PROJECT_ROOT, COVERAGE_PATTERN.format(worker=worker_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        existing = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                existing = json.load(file)
+        existing.update(self.coverage)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(existing, file, ensure_ascii=False, indent=2)
+
+
+def load_runtime_coverage():
+    """合并所有worker记录的运行时覆盖率"""
+    coverage = {}
+    for path in glob.glob(os.path.join(PROJECT_ROOT, COVERAGE_PATTERN.format(worker="*"))):
+        with open(path, 'r', encoding='utf-8') as file:
+            for key, files in json.load(file).items():
+                coverage.setdefault(key, set()).update(files)
+    return coverage
+
+
+def build_index():
+    """为每个场景建立依赖: 静态分析结果与运行时覆盖率的并集"""
+    static_index = StaticIndex()
+    runtime = load_runtime_coverage()
+    index = []
+    for scenario in load_scenarios():
+        files = {scenario["spec"]}
+        pages, locators, unmatched = set(), set(), []
+        for step in scenario["steps"]:
+            implementation = static_index.steps.get(step)
+            if not implementation:
+                unmatched.append(step)
+                continue
+            files.update(implementation["files"])
+            files.update(implementation["data"])
+            pages.update(implementation["pages"])
+            locators.update(implementation["locators"])
+        for param in scenario["params"]:
+            if param.startswith("test_data/"):
+                files.add(param)
+        files.update(runtime.get(scenario_key(scenario["spec"], scenario["name"]), set()))
+        index.append(dict(scenario, files=sorted(files), pages=sorted(pages),
+                          locators=sorted(locators), unmatched_steps=unmatched))
+    return index
+
+
+def changed_files(base=None):
+    """获取相对base的已修改文件(包括工作区未提交的修改)"""
+    commands = [["git", "diff", "--name-only", "HEAD"], ["git", "ls-files", "--others", "--exclude-standard"]]
+    if base:
+        commands.insert(0, ["git", "diff", "--name-only", f"{base}...HEAD"])
+    files = set()
+    for command in commands:
+        output = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout
+        files.update(line.strip() for line in output.splitlines() if line.strip())
+    return sorted(files)
+
+
+def data_base_file(path):
+    """TEST_DATA_ENV叠加文件 test_data/<env>/<name> 对应的基础数据文件 test_data/<name>，其他路径返回None"""
+    parts = path.split("/")
+    if len(parts) == 3 and parts[0] == "test_data":
+        return f"test_data/{parts[2]}"
+    return None
+
+
+def select_scenarios(index, changed):
+    """选出受修改文件影响的场景
+
+    环境叠加数据文件按对应的基础数据文件匹配；修改了全局文件、索引中没有的测试数据文件，
+    或场景有无法匹配实现的步骤时保守地选中
+    """
+    changed = {path.replace(os.sep, "/") for path in changed}
+    changed.update(filter(None, [data_base_file(path) for path in changed]))
+    if any(path in GLOBAL_FILES or path.startswith(GLOBAL_PREFIXES) for path in changed):
+        return list(index)
+    indexed = set().union(*(scenario["files"] for scenario in index))
+    if any(path.startswith("test_data/") and path not in indexed and not data_base_file(path) for path in changed):
+        return list(index)
+    return [scenario for scenario in index
+            if changed.intersection(scenario["files"]) or (scenario["unmatched_steps"] and changed)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测试影响分析: 只运行受修改影响的场景")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("index", help="输出场景依赖索引(JSON)")
+    select_parser = subparsers.add_parser("select", help="根据修改的文件选择场景")
+    select_parser.add_argument("files", nargs="*", help="修改的文件，不指定时从git获取")
+    select_parser.add_argument("--base", help="与该git引用比较，例如 origin/main")
+    select_parser.add_argument("--run", action="store_true", help="直接用gauge运行选中的场景")
+    select_parser.add_argument("--gauge-args", default="", help="传给gauge run的额外参数，例如 \"-p -n 4\"")
+    args = parser.parse_args()
+
+    index = build_index()
+    if args.command == "index":
+        print(json.dumps(index, ensure_ascii=False, indent=2))
+        return 0
+
+    changed = args.files or changed_files(args.base)
+    selected = select_scenarios(index, changed)
+    selectors = [scenario_selector(scenario) for scenario in selected]
+    print(f"修改的文件: {', '.join(changed) or '无'}", file=sys.stderr)
+    print(f"选中 {len(selected)}/{len(index)} 个场景", file=sys.stderr)
+    if not args.run:
+        print("\n".join(selectors))
+        return 0
+    if not selectors:
+        return 0
+    return subprocess.run(["gauge", "run", *shlex.split(args.gauge_args), *selectors], cwd=PROJECT_ROOT).returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+
+from pages.login_page import LoginPage
+from pages.secure_page import SecurePage
+from utils.test_data import TestData
+from utils.timing import percentile
+
+# 登录流程的计时阶段
+PHASES = ("open", "submit", "verify", "iteration")
+
+
+def run_virtual_user(browser_manager, user_index, options, credentials, samples, counters, lock):
+    """单个虚拟用户: 在自己的上下文中循环执行 打开登录页 -> 提交 -> 验证登录"""
+    # 按ramp-up均匀错开虚拟用户的启动时间
+    time.sleep(options["ramp_up"] * user_index / max(options["contexts"], 1))
+    deadline = options["start"] + options["ramp_up"] + options["duration"] if options["duration"] else None
+
+    context = browser_manager.browser.new_context()
+    try:
+        page = context.new_page()
+        login_page = LoginPage(page)
+        secure_page = SecurePage(page)
+        iteration = 0
+        while True:
+            if options["iterations"] and iteration >= options["iterations"]:
+                break
+            if deadline and time.perf_counter() >= deadline:
+                break
+            iteration += 1
+
+            timings = {}
+            error = None
+            iteration_start = time.perf_counter()
+            try:
+                context.clear_cookies()
+                phase_start = time.perf_counter()
+                login_page.open()
+                timings["open"] = time.perf_counter() - phase_start
+
+                phase_start = time.perf_counter()
+                login_page.login(credentials["username"], credentials["password"])
+                kind, _ = login_page.get_login_result()
+                timings["submit"] = time.perf_counter() - phase_start
+                if kind != "success":
+                    raise AssertionError("登录失败")
+
+                phase_start = time.perf_counter()
+                if not secure_page.is_logged_in():
+                    raise AssertionError("未找到注销按钮")
+                timings["verify"] = time.perf_counter() - phase_start
+                timings["iteration"] = time.perf_counter() - iteration_start
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+
+            with lock:
+                for phase, seconds in timings.items():
+                    samples[phase].append(seconds * 1000)
+                if error:
+                    counters["errors"] += 1
+                    counters["error_messages"][error.splitlines()[0][:200]] += 1
+                else:
+                    counters["successes"] += 1
+        # 记录最后一次迭代结束的时间，吞吐量不包含关闭上下文的耗时
+        with lock:
+            counters["finished"] = max(counters["finished"], time.perf_counter())
+    finally:
+        context.close()
+
+
+def run_process(options):
+    """在当前进程中启动浏览器并运行K个并发虚拟用户，返回原始样本"""
+    # 并发的虚拟用户需要异步引擎，所有线程的调用在同一个事件循环中并发执行
+    os.environ["ENGINE"] = "async"
+    os.environ.setdefault("HEADLESS", "true")
+    from utils.browser_manager import BrowserManager
+
+    browser_manager = BrowserManager()
+    browser_manager.start()
+    credentials = TestData.get_login_credentials().get("valid_user")
+    samples = defaultdict(list)
+    counters = {"successes": 0, "errors": 0, "error_messages": defaultdict(int), "finished": 0.0}
+    lock = threading.Lock()
+    options = dict(options, start=time.perf_counter())
+
+    threads = [
+        threading.Thread(
+            target=run_virtual_user,
+            args=(browser_manager, index, options, credentials, samples, counters, lock),
+            name=f"virtual-user-{index}"
+        )
+        for index in range(options["contexts"])
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        browser_manager.stop()
+
+    # 本进程的负载时长: 从虚拟用户开始到最后一个虚拟用户结束，不包含启动进程和浏览器的耗时
+    elapsed = max(counters["finished"] - options["start"], 0)
+    return {
+        "elapsed": elapsed,
+        "samples": dict(samples),
+        "successes": counters["successes"],
+        "errors": counters["errors"],
+        "error_messages": dict(counters["error_messages"])
+    }
+
+
+def summarize(results, options, wall_time=None):
+    """合并各进程的结果，计算吞吐量、错误率和各阶段延迟百分位
+
+    吞吐量的分母是各进程负载时长的最大值，不包含启动进程和浏览器的耗时；wall_time为包含启动在内的总耗时
+    """
+    elapsed = max((result["elapsed"] for result in results), default=0)
+    samples = defaultdict(list)
+    error_messages = defaultdict(int)
+    successes = errors = 0
+    for result in results:
+        for phase, values in result["samples"].items():
+            samples[phase].extend(values)
+        for message, count in result["error_messages"].items():
+            error_messages[message] += count
+        successes += result["successes"]
+        errors += result["errors"]
+
+    total = successes + errors
+    latency = {}
+    for phase in PHASES:
+        values = samples.get(phase, [])
+        if values:
+            latency[phase] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p90_ms": round(percentile(values, 90), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(max(values), 2)
+            }
+    return {
+        "options": options,
+        "elapsed_s": round(elapsed, 2),
+        "wall_time_s": round(wall_time, 2) if wall_time is not None else None,
+        "iterations": total,
+        "successes": successes,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0,
+        "throughput_per_s": round(successes / elapsed, 2) if elapsed else 0,
+        "latency": latency,
+        "error_messages": dict(error_messages)
+    }
+
+
+def run_load_test(contexts=4, duration=60, iterations=0, ramp_up=0, processes=1):
+    """运行登录流程负载测试并返回汇总结果
+
+    duration和iterations至少指定一个: iterations为每个虚拟用户的迭代次数，duration为ramp-up之后的持续秒数
+    """
+    if not duration and not iterations:
+        raise ValueError("duration和iterations至少需要指定一个")
+    options = {
+        "contexts": contexts,
+        "duration": duration,
+        "iterations": iterations,
+        "ramp_up": ramp_up,
+        "processes": processes
+    }
+
+    start = time.perf_counter()
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(run_process, [options] * processes)
+    else:
+        results = [run_process(options)]
+    return summarize(results, options, time.perf_counter() - start)
+
+
+def print_summary(summary):
+    """输出负载测试结果"""
+    print(f"迭代 {summary['iterations']} 次, 成功 {summary['successes']}, 失败 {summary['errors']} "
+          f"(错误率 {summary['error_rate']:.2%}), 耗时 {summary['elapsed_s']}s, "
+          f"吞吐量 {summary['throughput_per_s']} 次/秒")
+    for phase, stats in summary["latency"].items():
+        print(f"  {phase}: p50 {stats['p50_ms']}ms, p90 {stats['p90_ms']}ms, p95 {stats['p95_ms']}ms, "
+              f"p99 {stats['p99_ms']}ms, 最大 {stats['max_ms']}ms")
+    for message, count in summary["error_messages"].items():
+        print(f"  错误 x{count}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录流程负载测试: LoginPage.login -> SecurePage.is_logged_in")
+    parser.add_argument("--contexts", type=int, default=4, help="每个进程的并发浏览器上下文(虚拟用户)数量")
+    parser.add_argument("--duration", type=float, default=0, help="ramp-up之后的持续时间(秒)")
+    parser.add_argument("--iterations", type=int, default=0, help="每个虚拟用户的迭代次数")
+    parser.add_argument("--ramp-up", type=float, default=0, help="在该时间(秒)内逐步启动所有虚拟用户")
+    parser.add_argument("--processes", type=int, default=1, help="进程数量，每个进程启动一个浏览器")
+    parser.add_argument("--mock-server", action="store_true", help="对本地模拟服务器施压")
+    parser.add_argument("--latency-ms", type=float, default=None, help="模拟服务器注入的延迟(毫秒)")
+    parser.add_argument("--output", default=os.path.join("reports", "perf", "load_test.json"), help="JSON报告路径")
+    args = parser.parse_args()
+    if not args.duration and not args.iterations:
+        args.duration = 60
+
+    mock_server = None
+    if args.mock_server:
+        from utils.mock_server import MockLoginServer
+        mock_server = MockLoginServer(latency_ms=args.latency_ms)
+        os.environ["TEST_BASE_URL"] = mock_server.start()
+
+    try:
+        summary = run_load_test(args.contexts, args.duration, args.iterations, args.ramp_up, args.processes)
+    finally:
+        if mock_server:
+            mock_server.stop()
+
+    print_summary(summary)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+    print(f"报告已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pages.login_page import LoginPage
+from pages.secure_page import SecurePage
+from utils.timing import perf_recorder
+
+
+def check_login(page, row):
+    """使用页面对象执行一行凭据的登录并校验结果，返回该行的结果字典"""
+    expected = (row.get("expected") or "success").strip().lower()
+    expected_message = (row.get("message") or "").strip()
+    result = {
+        "username": row.get("username", ""),
+        "expected": expected,
+        "passed": False,
+        "actual": None,
+        "message": None,
+        "error": None
+    }
+
+    start = time.perf_counter()
+    try:
+        login_page = LoginPage(page)
+        login_page.open()
+        login_page.login(row.get("username", ""), row.get("password", ""))
+        kind, message = login_page.get_login_result()
+        result["actual"] = kind
+        result["message"] = (message or "").strip()
+
+        passed = kind == expected and expected_message in result["message"]
+        if passed and expected == "success":
+            passed = SecurePage(page).is_logged_in()
+        result["passed"] = passed
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        perf_recorder.record("login_matrix.row", result["duration_ms"])
+    return result
+
+
+class LoginMatrixRunner:
+    """批量登录校验，将凭据表分发到同一浏览器中的多个上下文并发执行
+
+    并发依赖异步引擎(ENGINE=async): 代理对象可以在多个线程中同时使用，所有调用在管理器的事件循环中并发执行。
+    同步引擎下Playwright对象只能在创建线程中使用，此时退化为在一个上下文中依次执行。
+    """
+
+    def __init__(self, browser_manager, concurrency=None):
+        self.browser_manager = browser_manager
+        self.concurrency = int(concurrency or os.environ.get("BATCH_CONCURRENCY", "8"))
+
+    def run(self, rows):
+        """执行所有行并返回汇总结果"""
+        start = time.perf_counter()
+        results = [None] * len(rows)
+        concurrency = self.concurrency if self.browser_manager.is_async_engine() else 1
+        concurrency = max(min(concurrency, len(rows)), 1)
+
+        # 每个worker持有一个上下文，依次取行执行，行之间清除cookie
+        next_index = iter(range(len(rows)))
+        index_lock = threading.Lock()
+
+        def worker():
+            context = self.browser_manager.browser.new_context()
+            self.browser_manager.network_router.install(context)
+            try:
+                page = context.new_page()
+                while True:
+                    with index_lock:
+                        index = next(next_index, None)
+                    if index is None:
+                        return
+                    context.clear_cookies()
+                    results[index] = dict(check_login(page, rows[index]), row=index + 1)
+            finally:
+                context.close()
+
+        if concurrency == 1:
+            worker()
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="login-matrix") as executor:
+                for future in [executor.submit(worker) for _ in range(concurrency)]:
+                    future.result()
+
+        failed = [result for result in results if not result["passed"]]
+        return {
+            "total": len(results),
+            "passed": len(results) - len(failed),
+            "failed": len(failed),
+            "concurrency": concurrency,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "rows": results
+        }
+
+    @staticmethod
+    def write_report(summary, worker_id="0"):
+        """将汇总结果写入JSON报告"""
+        report_dir = os.environ.get("PERF_REPORT_DIR", os.path.join("reports", "perf"))
+        os.makedirs(report_dir, exist_ok=True)
+        report_path = os.path.join(report_dir, f"login_matrix_{worker_id}.json")
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return report_path
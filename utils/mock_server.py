@@ -0,0 +1,195 @@
+import argparse
+import os
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote
+
+from utils.test_data import TestData
+
+# 页面结构与 the-internet.herokuapp.com 保持一致，LoginPage/SecurePage的定位器可以直接使用
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>The Internet</title></head>
+<body>
+<div class="row">
+  <div id="flash-messages" class="large-12 columns">{flash}</div>
+</div>
+<div id="content" class="large-12 columns">
+{content}
+</div>
+</body>
+</html>
+"""
+
+FLASH_TEMPLATE = """<div data-alert id="flash" class="flash {kind}">
+    {message}
+    <a href="#" class="close">x</a>
+  </div>"""
+
+LOGIN_CONTENT = """<div class="example">
+  <h2>Login Page</h2>
+  <h4 class="subheader">This is where you can log into the secure area.</h4>
+  <form name="login" method="post" action="/authenticate" id="login">
+    <div class="row"><div class="large-6 small-12 columns">
+      <label for="username">Username</label>
+      <input type="text" name="username" id="username">
+    </div></div>
+    <div class="row"><div class="large-6 small-12 columns">
+      <label for="password">Password</label>
+      <input type="password" name="password" id="password">
+    </div></div>
+    <button class="radius" type="submit"><i class="fa fa-2x fa-sign-in"> Login</i></button>
+  </form>
+</div>"""
+
+SECURE_CONTENT = """<div class="example">
+  <h2><i class="icon-lock"></i> Secure Area</h2>
+  <h4 class="subheader">Welcome to the Secure Area. When you are done click logout below.</h4>
+  <a class="button secondary radius" href="/logout"><i class="icon-2x icon-signout"> Logout</i></a>
+</div>"""
+
+
+class MockLoginHandler(BaseHTTPRequestHandler):
+    """处理 /login、/authenticate、/secure 和 /logout 请求"""
+
+    def log_message(self, format, *args):
+        # 不输出每个请求的访问日志
+        pass
+
+    def _delay(self):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+    def _cookies(self):
+        cookie = SimpleCookie()
+        cookie.load(self.headers.get("Cookie", ""))
+        return {key: morsel.value for key, morsel in cookie.items()}
+
+    def _redirect(self, location, flash=None, cookies=None):
+        self.send_response(303)
+        self.send_header("Location", location)
+        if flash:
+            self.send_header("Set-Cookie", f"flash={quote(flash[0] + ':' + flash[1])}; Path=/")
+        for cookie in cookies or []:
+            self.send_header("Set-Cookie", cookie)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _render(self, content):
+        flash_html = ""
+        flash = self._cookies().get("flash")
+        if flash:
+            kind, _, message = unquote(flash).partition(":")
+            flash_html = FLASH_TEMPLATE.format(kind=kind, message=message)
+        body = PAGE_TEMPLATE.format(flash=flash_html, content=content).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if flash:
+            # flash消息只显示一次
+            self.send_header("Set-Cookie", "flash=; Path=/; Max-Age=0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _is_logged_in(self):
+        return self._cookies().get("session") in self.server.sessions
+
+    def do_GET(self):
+        self._delay()
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/login"):
+            self._render(LOGIN_CONTENT)
+        elif path == "/secure":
+            if self._is_logged_in():
+                self._render(SECURE_CONTENT)
+            else:
+                self._redirect("/login", ("error", "You must login to view the secure area!"))
+        elif path == "/logout":
+            self.server.sessions.discard(self._cookies().get("session"))
+            self._redirect("/login", ("success", "You logged out of the secure area!"),
+                           ["session=; Path=/; Max-Age=0"])
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self._delay()
+        if self.path.split("?", 1)[0] != "/authenticate":
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", "0"))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        username = form.get("username", [""])[0]
+        password = form.get("password", [""])[0]
+
+        valid_user = TestData.get_login_credentials().get("valid_user")
+        if username != valid_user.get("username"):
+            self._redirect("/login", ("error", "Your username is invalid!"))
+        elif password != valid_user.get("password"):
+            self._redirect("/login", ("error", "Your password is invalid!"))
+        else:
+            token = secrets.token_hex(16)
+            self.server.sessions.add(token)
+            self._redirect("/secure", ("success", "You logged into a secure area!"),
+                           [f"session={token}; Path=/; HttpOnly"])
+
+
+class MockLoginServer:
+    """本地登录应用模拟服务器，替代 the-internet.herokuapp.com 的登录相关页面
+
+    默认监听临时端口，latency_ms 可为每个请求注入服务端延迟用于负载实验。
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=None):
+        self.host = host
+        self.port = port
+        if latency_ms is None:
+            latency_ms = float(os.environ.get("MOCK_SERVER_LATENCY_MS", "0"))
+        self.latency_ms = latency_ms
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.server.server_address[1]}"
+
+    def start(self):
+        """在后台线程中启动服务器，返回base_url"""
+        self.server = ThreadingHTTPServer((self.host, self.port), MockLoginHandler)
+        self.server.daemon_threads = True
+        self.server.latency_ms = self.latency_ms
+        self.server.sessions = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-login-server", daemon=True)
+        self.thread.start()
+        print(f"本地模拟服务器已启动: {self.base_url}, 注入延迟: {self.latency_ms}ms")
+        return self.base_url
+
+    def stop(self):
+        """停止服务器"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动本地登录应用模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="监听端口，0表示使用临时端口")
+    parser.add_argument("--latency-ms", type=float, default=None, help="每个请求注入的服务端延迟(毫秒)")
+    args = parser.parse_args()
+
+    server = MockLoginServer(args.host, args.port, args.latency_ms)
+    server.start()
+    print(f"运行测试时设置 TEST_BASE_URL={server.base_url}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def _split_list(value):
+    """将逗号分隔的配置拆分为列表"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class ResponseCache:
+    """静态资源响应缓存，内存中按LRU淘汰，可选持久化到磁盘
+
+    内存和磁盘都按总字节数限制大小，超过上限时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_bytes, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.size = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def get(self, url):
+        """获取缓存的响应，未命中时返回None"""
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry:
+                self.entries.move_to_end(url)
+                return entry
+        entry = self._read_disk(url)
+        if entry:
+            self._put_memory(url, entry)
+        return entry
+
+    def put(self, url, entry):
+        """缓存响应，单个响应超过上限时不缓存"""
+        if len(entry["body"]) > self.max_bytes:
+            return
+        self._put_memory(url, entry)
+        self._write_disk(url, entry)
+
+    def _put_memory(self, url, entry):
+        with self._lock:
+            old = self.entries.pop(url, None)
+            if old:
+                self.size -= len(old["body"])
+            self.entries[url] = entry
+            self.size += len(entry["body"])
+            while self.size > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted["body"])
+
+    def _read_disk(self, url):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, self._key(url))
+        try:
+            with open(f"{path}.json", 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            with open(f"{path}.body", 'rb') as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        # 更新修改时间，作为磁盘LRU的最近使用时间
+        os.utime(f"{path}.body")
+        return {"status": meta["status"], "headers": meta["headers"], "body": body, "fetch_ms": meta.get("fetch_ms", 0)}
+
+    def _write_disk(self, url, entry):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, self._key(url))
+        try:
+            with open(f"{path}.body", 'wb') as file:
+                file.write(entry["body"])
+            with open(f"{path}.json", 'w', encoding='utf-8') as file:
+                json.dump({"url": url, "status": entry["status"], "headers": entry["headers"],
+                           "fetch_ms": entry.get("fetch_ms", 0)}, file)
+        except OSError as e:
+            print(f"写入响应缓存失败: {str(e)}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """磁盘缓存超过上限时按最近使用时间删除最旧的条目"""
+        bodies = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".body"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                bodies.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        for _, size, path in sorted(bodies):
+            if total <= self.max_bytes:
+                break
+            for file_path in (path, path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+class NetworkRouter:
+    """浏览器上下文的网络路由层
+
+    根据配置拦截不需要的资源类型/URL，并从共享缓存中返回静态资源的GET请求，
+    同时统计拦截数、缓存命中/未命中以及节省的流量和时间。
+    """
+
+    def __init__(self):
+        self.block_resource_types = set(_split_list(os.environ.get("BLOCK_RESOURCE_TYPES", "")))
+        self.block_url_patterns = _split_list(os.environ.get("BLOCK_URL_PATTERNS", ""))
+        self.cache_enabled = os.environ.get("RESPONSE_CACHE", "false").lower() == "true"
+        self.cache_resource_types = set(_split_list(
+            os.environ.get("RESPONSE_CACHE_TYPES", "stylesheet,script,font,image")))
+        self.cache = None
+        if self.cache_enabled:
+            max_bytes = int(float(os.environ.get("RESPONSE_CACHE_MAX_MB", "100")) * 1024 * 1024)
+            self.cache = ResponseCache(max_bytes, os.environ.get("RESPONSE_CACHE_DIR") or None)
+        self.stats = {"blocked": 0, "hits": 0, "misses": 0, "bytes_saved": 0, "time_saved_ms": 0.0, "fetch_errors": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """是否需要在上下文上安装路由"""
+        return bool(self.block_resource_types or self.block_url_patterns or self.cache_enabled)
+
+    def install(self, context):
+        """在浏览器上下文上安装路由处理函数"""
+        if self.enabled:
+            context.route("**/*", self.handle)
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _should_block(self, request):
+        if request.resource_type in self.block_resource_types:
+            return True
+        return any(fnmatch.fnmatch(request.url, pattern) for pattern in self.block_url_patterns)
+
+    def handle(self, route):
+        """路由处理函数: 拦截、命中缓存或转发请求"""
+        request = route.request
+        if self._should_block(request):
+            self._count("blocked")
+            route.abort()
+            return
+
+        if not (self.cache and request.method == "GET" and request.resource_type in self.cache_resource_types):
+            route.continue_()
+            return
+
+        entry = self.cache.get(request.url)
+        if entry:
+            self._count("hits")
+            self._count("bytes_saved", len(entry["body"]))
+            self._count("time_saved_ms", entry.get("fetch_ms", 0))
+            route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return
+
+        self._count("misses")
+        start = time.perf_counter()
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # 获取失败(DNS/连接错误、上下文已关闭等)时交还浏览器自行请求，
+            # 避免路由处理函数异常导致请求挂起、导航一直等到超时
+            self._count("fetch_errors")
+            try:
+                route.continue_()
+            except Exception:
+                pass
+            return
+        fetch_ms = (time.perf_counter() - start) * 1000
+        if response.ok:
+            self.cache.put(request.url, {
+                "status": response.status,
+                "headers": response.headers,
+                "body": body,
+                "fetch_ms": fetch_ms
+            })
+        route.fulfill(response=response, body=body)
+
+    def report(self):
+        """输出并返回网络路由统计"""
+        if not self.enabled:
+            return {}
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0
+        print(f"网络路由统计: 拦截 {stats['blocked']} 个请求, 缓存命中 {stats['hits']} / 未命中 {stats['misses']} "
+              f"(命中率 {hit_rate:.1%}), 节省流量 {stats['bytes_saved'] / 1024:.1f}KB, "
+              f"节省时间约 {stats['time_saved_ms']:.0f}ms, 获取失败 {stats['fetch_errors']} 次")
+        return stats
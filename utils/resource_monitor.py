@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # psutil是可选依赖，Linux上没有时读取/proc
+    psutil = None
+
+
+def _proc_tree(root_pid):
+    """通过/proc读取root_pid及其所有子孙进程的 (pid, CPU秒数, RSS字节)，不可用时返回None"""
+    if not os.path.isdir("/proc"):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    stats, children = {}, {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as file:
+                # 进程名可能包含空格，从最后一个')'之后开始解析
+                fields = file.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        stats[pid] = ((int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * page_size)
+    processes = []
+    pending = [root_pid] if root_pid in stats else []
+    while pending:
+        pid = pending.pop()
+        processes.append((pid, *stats[pid]))
+        pending.extend(children.get(pid, []))
+    return processes
+
+
+def _psutil_tree(root_pid):
+    """通过psutil读取root_pid及其所有子孙进程的 (pid, CPU秒数, RSS字节)"""
+    try:
+        root = psutil.Process(root_pid)
+        tree = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+    processes = []
+    for process in tree:
+        try:
+            with process.oneshot():
+                cpu = process.cpu_times()
+                processes.append((process.pid, cpu.user + cpu.system, process.memory_info().rss))
+        except psutil.Error:
+            continue
+    return processes
+
+
+def process_tree(root_pid):
+    """读取进程树的资源占用，优先使用psutil，没有psutil的非Linux系统返回None"""
+    if psutil:
+        return _psutil_tree(root_pid)
+    return _proc_tree(root_pid)
+
+
+class ResourceMonitor:
+    """浏览器资源监控
+
+    - 后台线程按 RESOURCE_SAMPLE_INTERVAL_MS 采样浏览器进程树(本管理器的Playwright驱动及其启动的浏览器进程)的CPU和RSS
+    - 场景开始/结束时记录打开的上下文和页面数量以及内存变化(Playwright对象只能在所属线程中访问，因此计数由调用方传入)
+    - 记录泄漏的上下文和浏览器回收事件，套件结束时写入时间序列报告
+    RESOURCE_MONITOR=false 时不采样也不记录。
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("RESOURCE_MONITOR", "true").lower() == "true"
+        self.interval = int(os.environ.get("RESOURCE_SAMPLE_INTERVAL_MS", "1000")) / 1000
+        self.recycle_memory_mb = float(os.environ.get("BROWSER_RECYCLE_MEMORY_MB", "0"))
+        self.recycle_scenarios = int(os.environ.get("BROWSER_RECYCLE_SCENARIOS", "0"))
+        self.samples = []
+        self.scenarios = []
+        self.leaks = []
+        self.recycles = []
+        self.root_pid = None
+        self.browser_local = True  # 浏览器是否由本进程树启动，连接共享服务器时为False
+        self.started_at = time.time()
+        self.current = None
+        self._last_cpu = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, root_pid, browser_local=True):
+        """开始在后台采样root_pid及其子孙进程，root_pid为None时只记录上下文和页面数量
+
+        browser_local为False(连接共享浏览器服务器)时进程树只有驱动，浏览器内存不在其中，不按内存回收
+        """
+        if not self.enabled:
+            return
+        self.stop()
+        self.root_pid = root_pid
+        self.browser_local = browser_local
+        self._last_cpu = None
+        if root_pid is None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台采样"""
+        if self._thread:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.sample()
+            self._stopping.wait(self.interval)
+
+    def sample(self):
+        """采样一次进程树，返回采样记录(无法读取进程信息时返回None)"""
+        processes = process_tree(self.root_pid) if self.root_pid else None
+        if processes is None:
+            return None
+        now = time.time()
+        cpu_seconds = {pid: cpu for pid, cpu, _ in processes}
+        sample = {
+            "time_s": round(now - self.started_at, 3),
+            "processes": len(processes),
+            "cpu_percent": None,
+            "rss_mb": round(sum(rss for _, _, rss in processes) / 1024 / 1024, 2)
+        }
+        current = self.current
+        if current:
+            sample["scenario"] = current["name"]
+        # 后台线程和场景结束时都会采样
+        with self._lock:
+            if self._last_cpu:
+                last_time, last_cpu = self._last_cpu
+                # 只比较两次采样都存在的进程，避免进程启动/退出造成的跳变
+                used = sum(cpu - last_cpu[pid] for pid, cpu in cpu_seconds.items() if pid in last_cpu)
+                sample["cpu_percent"] = round(max(used, 0) / max(now - last_time, 1e-6) * 100, 1)
+            self._last_cpu = (now, cpu_seconds)
+            self.samples.append(sample)
+        return sample
+
+    def latest_rss_mb(self):
+        """最近一次采样的RSS(MB)，没有采样时返回None"""
+        with self._lock:
+            return self.samples[-1]["rss_mb"] if self.samples else None
+
+    def begin_scenario(self, name, contexts, pages):
+        """场景开始时记录上下文/页面数量和内存"""
+        if not self.enabled:
+            return
+        # 在场景开始时采样一次，使内存变化只包含本场景
+        sample = self.sample()
+        self.current = {
+            "name": name,
+            "started_s": round(time.time() - self.started_at, 3),
+            "contexts_before": contexts,
+            "pages_before": pages,
+            "rss_before_mb": sample["rss_mb"] if sample else None
+        }
+
+    def end_scenario(self, contexts, pages):
+        """场景结束时记录上下文/页面数量和内存变化"""
+        if not self.enabled or not self.current:
+            return
+        # 场景结束时补采一次，保证短场景也有内存数据
+        sample = self.sample()
+        scenario = self.current
+        self.current = None
+        rss_after = sample["rss_mb"] if sample else None
+        scenario.update({
+            "duration_s": round(time.time() - self.started_at - scenario["started_s"], 3),
+            "contexts_after": contexts,
+            "pages_after": pages,
+            "rss_after_mb": rss_after,
+            "rss_delta_mb": (round(rss_after - scenario["rss_before_mb"], 2)
+                             if rss_after is not None and scenario["rss_before_mb"] is not None else None)
+        })
+        self.scenarios.append(scenario)
+
+    def record_leak(self, scenario_name, contexts, pages):
+        """记录场景结束后仍然打开的、不属于管理器的上下文"""
+        print(f"警告: 场景 '{scenario_name}' 结束后有 {contexts} 个上下文({pages} 个页面)未关闭，已强制关闭")
+        if self.enabled:
+            self.leaks.append({
+                "time_s": round(time.time() - self.started_at, 3),
+                "scenario": scenario_name,
+                "contexts": contexts,
+                "pages": pages
+            })
+
+    def should_recycle(self, scenario_count):
+        """是否达到回收浏览器的阈值: BROWSER_RECYCLE_SCENARIOS个场景或BROWSER_RECYCLE_MEMORY_MB内存"""
+        if self.recycle_scenarios and scenario_count >= self.recycle_scenarios:
+            return f"已运行 {scenario_count} 个场景"
+        rss = self.latest_rss_mb() if self.enabled and self.browser_local else None
+        if self.recycle_memory_mb and rss is not None and rss >= self.recycle_memory_mb:
+            return f"内存 {rss}MB 超过 {self.recycle_memory_mb:g}MB"
+        return None
+
+    def record_recycle(self, reason):
+        """记录一次浏览器回收"""
+        print(f"回收浏览器: {reason}")
+        if self.enabled:
+            self.recycles.append({"time_s": round(time.time() - self.started_at, 3), "reason": reason})
+
+    def summary(self):
+        """资源使用汇总"""
+        with self._lock:
+            samples = list(self.samples)
+        rss_values = [sample["rss_mb"] for sample in samples]
+        cpu_values = [sample["cpu_percent"] for sample in samples if sample["cpu_percent"] is not None]
+        return {
+            "samples": len(samples),
+            "peak_rss_mb": max(rss_values, default=None),
+            "mean_cpu_percent": round(sum(cpu_values) / len(cpu_values), 1) if cpu_values else None,
+            "peak_cpu_percent": max(cpu_values, default=None),
+            "leaked_contexts": sum(leak["contexts"] for leak in self.leaks),
+            "recycles": len(self.recycles)
+        }
+
+    def write_report(self, worker_id="0"):
+        """将时间序列、场景变化、泄漏和回收事件写入JSON报告，返回报告路径"""
+        if not self.enabled or not (self.samples or self.scenarios):
+            return None
+        report_dir = os.environ.get("PERF_REPORT_DIR", os.path.join("reports", "perf"))
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"resources_{worker_id}.json")
+        with self._lock:
+            samples = list(self.samples)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "worker": worker_id,
+                "summary": self.summary(),
+                "samples": samples,
+                "scenarios": self.scenarios,
+                "leaks": self.leaks,
+                "recycles": self.recycles
+            }, file, ensure_ascii=False, indent=2)
+        return path
+
+    def print_summary(self):
+        """输出资源使用汇总和内存增长最多的场景"""
+        if not self.enabled or not (self.samples or self.scenarios):
+            return
+        summary = self.summary()
+        print(f"浏览器资源: 峰值内存 {summary['peak_rss_mb']}MB, 平均CPU {summary['mean_cpu_percent']}%, "
+              f"泄漏上下文 {summary['leaked_contexts']} 个, 回收 {summary['recycles']} 次")
+        growth = sorted((s for s in self.scenarios if s["rss_delta_mb"]), key=lambda s: s["rss_delta_mb"], reverse=True)
+        for scenario in growth[:3]:
+            if scenario["rss_delta_mb"] > 0:
+                print(f"  {scenario['name']}: 内存 +{scenario['rss_delta_mb']}MB")
@@ -0,0 +1,179 @@
+import argparse
+import glob
+import heapq
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from utils.spec_index import load_scenarios, relative_path, scenario_key, scenario_selector
+from utils.test_data import PROJECT_ROOT
+
+# 场景耗时文件，每个worker写入一个
+DURATION_PATTERN = os.path.join(".cache", "scenario_durations.{worker}.json")
+
+# 每个场景保留的历史耗时数量
+HISTORY_SIZE = 5
+
+# 没有任何历史数据时假定的场景耗时(毫秒)
+DEFAULT_DURATION_MS = 1000.0
+
+
+class ScenarioDurations:
+    """在before_scenario/after_scenario之间记录场景耗时，供下次运行按耗时分片(SCENARIO_DURATIONS=false时关闭)"""
+
+    def __init__(self):
+        self.enabled = os.environ.get("SCENARIO_DURATIONS", "true").lower() == "true"
+        self.durations = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """场景开始时计时"""
+        if self.enabled:
+            self._local.start = time.perf_counter()
+
+    def end(self, spec_file, scenario_name):
+        """场景结束时记录耗时"""
+        start = getattr(self._local, "start", None)
+        if not self.enabled or start is None:
+            return
+        self._local.start = None
+        duration_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.durations.setdefault(scenario_key(relative_path(spec_file), scenario_name), []).append(duration_ms)
+
+    def save(self, worker_id="0"):
+        """将本次耗时合并到本worker的耗时文件，每个场景保留最近 HISTORY_SIZE 次"""
+        with self._lock:
+            durations = {key: list(values) for key, values in self.durations.items()}
+        if not durations:
+            return
+        path = os.path.join(PROJECT_ROOT, DURATION_PATTERN.format(worker=worker_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        history = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                history = json.load(file)
+        for key, values in durations.items():
+            history[key] = (history.get(key, []) + [round(value, 2) for value in values])[-HISTORY_SIZE:]
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(history, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+
+def load_durations():
+    """合并所有worker(以及从其他CI节点收集的)耗时文件，返回 {场景标识: 预估耗时毫秒}
+
+    预估耗时取历史样本的中位数，减少单次异常运行的影响。
+    """
+    samples = {}
+    for path in glob.glob(os.path.join(PROJECT_ROOT, DURATION_PATTERN.format(worker="*"))):
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                for key, values in json.load(file).items():
+                    samples.setdefault(key, []).extend(values)
+        except (OSError, ValueError):
+            continue
+    estimates = {}
+    for key, values in samples.items():
+        ordered = sorted(values)
+        estimates[key] = ordered[len(ordered) // 2]
+    return estimates
+
+
+def estimate(scenarios, durations):
+    """为每个场景附加预估耗时，没有历史数据的场景使用已知场景的平均耗时"""
+    known = [durations[scenario_key(s["spec"], s["name"])] for s in scenarios
+             if scenario_key(s["spec"], s["name"]) in durations]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION_MS
+    return [dict(scenario, duration_ms=durations.get(scenario_key(scenario["spec"], scenario["name"]), default),
+                 estimated=scenario_key(scenario["spec"], scenario["name"]) not in durations)
+            for scenario in scenarios]
+
+
+def balance(scenarios, shard_count):
+    """最长处理时间优先(LPT): 按预估耗时从长到短依次分给当前总耗时最少的分片
+
+    返回分片列表，每个分片包含 scenarios 和 duration_ms。分配只依赖场景列表和耗时，
+    因此各CI节点独立计算得到相同的结果。
+    """
+    shards = [{"scenarios": [], "duration_ms": 0.0} for _ in range(shard_count)]
+    heap = [(0.0, index) for index in range(shard_count)]
+    ordered = sorted(scenarios, key=lambda s: (-s["duration_ms"], s["spec"], s["line"]))
+    for scenario in ordered:
+        total, index = heapq.heappop(heap)
+        shards[index]["scenarios"].append(scenario)
+        shards[index]["duration_ms"] = total + scenario["duration_ms"]
+        heapq.heappush(heap, (shards[index]["duration_ms"], index))
+    # 分片内按规范文件和行号执行，保持与未分片时相同的顺序
+    for shard in shards:
+        shard["scenarios"].sort(key=lambda s: (s["spec"], s["line"]))
+    return shards
+
+
+def plan(shard_count, specs_dir="specs"):
+    """读取规范和历史耗时，返回均衡的分片"""
+    scenarios = estimate(load_scenarios(specs_dir), load_durations())
+    return balance(scenarios, shard_count)
+
+
+def run_shard(shard, gauge_args, stream_id=None):
+    """启动gauge运行一个分片，返回进程；本地并行时为每个分片使用独立的报告目录和执行流编号"""
+    selectors = [scenario_selector(scenario) for scenario in shard["scenarios"]]
+    env = dict(os.environ)
+    if stream_id is not None:
+        env["GAUGE_PARALLEL_STREAM_ID"] = str(stream_id)
+        env["gauge_reports_dir"] = os.path.join("reports", f"shard-{stream_id}")
+    return subprocess.Popen(["gauge", "run", *gauge_args, *selectors], cwd=PROJECT_ROOT, env=env)
+
+
+def print_plan(shards):
+    total = sum(shard["duration_ms"] for shard in shards)
+    print(f"{len(shards)} 个分片，总预估耗时 {total / 1000:.1f}s，理想每片 {total / len(shards) / 1000:.1f}s",
+          file=sys.stderr)
+    for index, shard in enumerate(shards):
+        estimated = sum(1 for scenario in shard["scenarios"] if scenario["estimated"])
+        print(f"  分片 {index}: {len(shard['scenarios'])} 个场景 ({estimated} 个无历史耗时)，"
+              f"预估 {shard['duration_ms'] / 1000:.1f}s", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按历史场景耗时均衡分片")
+    parser.add_argument("--shard-count", type=int, default=int(os.environ.get("SHARD_COUNT", "1")),
+                        help="分片数量(CI节点数)")
+    parser.add_argument("--shard-index", type=int, default=int(os.environ.get("SHARD_INDEX", "0")),
+                        help="当前节点的分片编号，从0开始")
+    parser.add_argument("--local", type=int, metavar="N",
+                        help="在本机把场景分成N片，同时启动N个gauge进程运行(代替 gauge run -p -n N)")
+    parser.add_argument("--run", action="store_true", help="直接用gauge运行当前分片")
+    parser.add_argument("--gauge-args", default="", help="传给gauge run的额外参数，例如 \"--env ci\"")
+    parser.add_argument("--specs", default="specs", help="规范目录")
+    args = parser.parse_args()
+    gauge_args = shlex.split(args.gauge_args)
+
+    if args.local:
+        shards = plan(args.local, args.specs)
+        print_plan(shards)
+        processes = [run_shard(shard, gauge_args, index) for index, shard in enumerate(shards) if shard["scenarios"]]
+        return max((process.wait() for process in processes), default=0)
+
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index 必须在 [0, --shard-count) 范围内")
+    shards = plan(args.shard_count, args.specs)
+    print_plan(shards)
+    shard = shards[args.shard_index]
+    if not args.run:
+        print("\n".join(scenario_selector(scenario) for scenario in shard["scenarios"]))
+        return 0
+    if not shard["scenarios"]:
+        return 0
+    return run_shard(shard, gauge_args).wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
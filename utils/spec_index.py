@@ -0,0 +1,70 @@
+import glob
+import os
+import re
+
+from utils.test_data import PROJECT_ROOT
+
+# 步骤参数: "静态参数" 和 <动态参数/表格参数>
+STEP_PARAM_PATTERN = re.compile(r'"[^"]*"|<[^>]*>')
+
+
+def normalize_step(text):
+    """将步骤文本中的参数替换为占位符，使规范中的步骤和步骤实现的文本可以互相匹配"""
+    return STEP_PARAM_PATTERN.sub("{}", text.strip())
+
+
+def relative_path(path):
+    """转换为相对项目根目录、使用/分隔的路径"""
+    return os.path.relpath(os.path.abspath(path), PROJECT_ROOT).replace(os.sep, "/")
+
+
+def parse_spec(spec_path):
+    """解析Markdown格式的Gauge规范文件
+
+    返回场景列表，每个场景包含 spec、name、line(场景标题的行号)、steps(规范化后的步骤)和
+    params(静态参数，用于识别场景读取的数据文件)。第一个场景之前的步骤是上下文步骤，会加入每个场景。
+    """
+    with open(spec_path, 'r', encoding='utf-8') as file:
+        lines = file.read().splitlines()
+
+    spec = relative_path(spec_path)
+    context_steps, context_params = [], []
+    scenarios = []
+    current = None
+    for index, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        if line.startswith("## "):
+            current = {"spec": spec, "name": line[3:].strip(), "line": index + 1,
+                       "steps": list(context_steps), "params": list(context_params)}
+            scenarios.append(current)
+        elif line.startswith("* "):
+            text = line[2:].strip()
+            # 步骤下方紧跟表格时，表格是该步骤的最后一个参数
+            following = [next_line.strip() for next_line in lines[index + 1:index + 3] if next_line.strip()]
+            if following and following[0].startswith("|"):
+                text += " <table>"
+            params = re.findall(r'"([^"]*)"', text)
+            steps = current["steps"] if current else context_steps
+            step_params = current["params"] if current else context_params
+            steps.append(normalize_step(text))
+            step_params.extend(params)
+    return scenarios
+
+
+def load_scenarios(specs_dir="specs"):
+    """解析目录下的所有规范文件"""
+    scenarios = []
+    pattern = os.path.join(PROJECT_ROOT, specs_dir, "**", "*.spec")
+    for spec_path in sorted(glob.glob(pattern, recursive=True)):
+        scenarios.extend(parse_spec(spec_path))
+    return scenarios
+
+
+def scenario_key(spec, name):
+    """场景的唯一标识: 规范文件路径::场景名"""
+    return f"{spec}::{name}"
+
+
+def scenario_selector(scenario):
+    """gauge run 可以接受的场景选择器: 规范文件:行号"""
+    return f"{scenario['spec']}:{scenario['line']}"
@@ -1,57 +1,184 @@
+import csv
 import json
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
+
+# 项目根目录，数据文件路径都相对于它解析，而不是当前工作目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DATA_DIR = os.path.join(PROJECT_ROOT, "test_data")
+
+DEFAULT_CREDENTIALS = {
+    "valid_user": {
+        "username": "tomsmith",
+        "password": "SuperSecretPassword!"
+    },
+    "invalid_user": {
+        "username": "invalid",
+        "password": "wrongpassword"
+    }
+}
+
+DEFAULT_URLS = {
+    "base_url": "http://the-internet.herokuapp.com",
+    "login_url": "http://the-internet.herokuapp.com/login",
+    "secure_url": "http://the-internet.herokuapp.com/secure"
+}
+
+
+def _merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    """递归合并两个字典，overlay中的值优先"""
+    merged = dict(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class TestDataRegistry:
+    """测试数据注册表，缓存已加载的数据文件
+
+    每个文件只在首次使用或文件修改时间(mtime)变化时重新读取。
+    设置 TEST_DATA_ENV 环境变量后，test_data/<env>/<name> 会叠加在基础文件之上。
+    """
+
+    def __init__(self, data_dir: str = TEST_DATA_DIR):
+        self.data_dir = data_dir
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.access_listener = None  # 可选的回调，每次访问数据文件时以绝对路径调用(用于记录运行时依赖)
+
+    def resolve_path(self, file_path: str) -> str:
+        """将相对路径解析为相对项目根目录的绝对路径"""
+        if os.path.isabs(file_path):
+            return file_path
+        return os.path.join(PROJECT_ROOT, file_path)
+
+    def load_file(self, file_path: str) -> Any:
+        """加载JSON或CSV文件，文件未变化时直接返回缓存
+
+        CSV文件按表头解析为字典列表
+        """
+        path = self.resolve_path(file_path)
+        if self.access_listener:
+            self.access_listener(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            raise FileNotFoundError(f"测试数据文件不存在: {path}")
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            if path.lower().endswith(".csv"):
+                data = list(csv.DictReader(file))
+            else:
+                data = json.load(file)
+
+        with self._lock:
+            self._cache[path] = (mtime, data)
+        return data
+
+    def get(self, name: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """按文件名获取测试数据，并叠加当前环境的覆盖文件"""
+        try:
+            data = self.load_file(os.path.join(self.data_dir, name))
+        except FileNotFoundError:
+            if default is None:
+                raise
+            data = default
+
+        env_name = os.environ.get("TEST_DATA_ENV")
+        if env_name:
+            overlay_path = os.path.join(self.data_dir, env_name, name)
+            if os.path.exists(overlay_path):
+                data = _merge(data, self.load_file(overlay_path))
+        return data
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+
+
+# 全局测试数据注册表
+registry = TestDataRegistry()
+
+
+class LazyData:
+    """延迟读取测试数据的描述符，在访问时才读取数据文件
+
+    用于页面类的类属性，例如 URL = TestData.lazy_url("login_url")，
+    这样导入页面类时不会读取文件，数据文件更新后也能获取到新值。
+    """
+
+    def __init__(self, getter, key):
+        self.getter = getter
+        self.key = key
+
+    def __get__(self, instance, owner):
+        return self.getter().get(self.key)
+
 
 class TestData:
     """测试数据管理类"""
-    
+
     @staticmethod
     def load_json_data(file_path: str) -> Dict[str, Any]:
-        """从JSON文件加载测试数据"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"测试数据文件不存在: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    
+        """从JSON文件加载测试数据(带缓存，相对路径基于项目根目录)"""
+        return registry.load_file(file_path)
+
     @staticmethod
     def get_login_credentials() -> Dict[str, str]:
         """获取登录凭据
-        
+
         如果存在test_data/credentials.json文件，将从该文件加载
         否则返回默认凭据
         """
-        data_file = "test_data/credentials.json"
-        
-        try:
-            return TestData.load_json_data(data_file)
-        except FileNotFoundError:
-            # 如果文件不存在，则返回默认凭据
-            return {
-                "valid_user": {
-                    "username": "tomsmith",
-                    "password": "SuperSecretPassword!"
-                },
-                "invalid_user": {
-                    "username": "invalid",
-                    "password": "wrongpassword"
-                }
-            }
-    
+        return registry.get("credentials.json", DEFAULT_CREDENTIALS)
+
     @staticmethod
     def get_test_urls() -> Dict[str, str]:
         """获取测试URL
-        
+
         如果存在test_data/urls.json文件，将从该文件加载
         否则返回默认URL
+        设置TEST_BASE_URL环境变量时，所有以base_url开头的URL都会改写到该地址(例如本地模拟服务器)
         """
-        data_file = "test_data/urls.json"
-        
-        try:
-            return TestData.load_json_data(data_file)
-        except FileNotFoundError:
-            # 如果文件不存在，则返回默认URL
-            return {
-                "base_url": "http://the-internet.herokuapp.com",
-                "login_url": "http://the-internet.herokuapp.com/login"
-            } 
\ No newline at end of file
+        urls = registry.get("urls.json", DEFAULT_URLS)
+        base_url_override = os.environ.get("TEST_BASE_URL")
+        if not base_url_override:
+            return urls
+        return TestData.rewrite_urls(urls, base_url_override)
+
+    @staticmethod
+    def rewrite_urls(urls: Dict[str, str], new_base_url: str) -> Dict[str, str]:
+        """将以原base_url开头的URL改写到新的base_url"""
+        base_url = urls.get("base_url", "").rstrip("/")
+        new_base_url = new_base_url.rstrip("/")
+        rewritten = {}
+        for key, url in urls.items():
+            if base_url and isinstance(url, str) and url.startswith(base_url):
+                url = new_base_url + url[len(base_url):]
+            rewritten[key] = url
+        return rewritten
+
+    @staticmethod
+    def load_credentials_table(file_path: str) -> List[Dict[str, str]]:
+        """加载凭据表(CSV或JSON)，每行包含username、password、expected(success/error)和可选的message
+
+        JSON文件可以是行列表，也可以是 {"rows": [...]} 形式
+        """
+        data = registry.load_file(file_path)
+        rows = data.get("rows", []) if isinstance(data, dict) else data
+        return [{key: "" if value is None else str(value) for key, value in row.items()} for row in rows]
+
+    @staticmethod
+    def lazy_url(key: str) -> LazyData:
+        """返回在访问时才解析的URL属性"""
+        return LazyData(TestData.get_test_urls, key)
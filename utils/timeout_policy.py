@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from utils.timing import percentile
+
+# 视为临时性、可以重试的导航错误；等待load/networkidle超时不在其中，页面确实无法就绪时应快速失败
+TRANSIENT_ERROR_MARKERS = (
+    "net::ERR_CONNECTION",
+    "net::ERR_NETWORK",
+    "net::ERR_TIMED_OUT",
+    "net::ERR_NAME_NOT_RESOLVED",
+    "net::ERR_EMPTY_RESPONSE",
+    "net::ERR_INTERNET_DISCONNECTED",
+    "NS_ERROR_NET",
+    "NS_ERROR_CONNECTION_REFUSED",
+    "Could not connect",
+)
+
+# 每个选择器保留的历史样本数量
+HISTORY_SIZE = 50
+
+
+class TimeoutPolicy:
+    """超时和重试策略
+
+    - 默认超时和否定检查(等待元素消失)的快速失败超时可通过环境变量配置
+    - 导航遇到临时性网络错误时按指数退避重试
+    - 记录每个选择器的等待耗时并持久化，ADAPTIVE_TIMEOUTS=true时按历史p95自动收紧超时，
+      并在套件结束时标记比历史明显变慢的选择器
+    """
+
+    def __init__(self):
+        self.default_timeout = int(os.environ.get("DEFAULT_TIMEOUT_MS", "10000"))
+        self.negative_timeout = int(os.environ.get("NEGATIVE_CHECK_TIMEOUT_MS", "1000"))
+        self.navigation_retries = int(os.environ.get("NAVIGATION_RETRIES", "2"))
+        self.retry_backoff = int(os.environ.get("RETRY_BACKOFF_MS", "500"))
+        self.adaptive = os.environ.get("ADAPTIVE_TIMEOUTS", "false").lower() == "true"
+        self.adaptive_factor = float(os.environ.get("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+        self.adaptive_min_timeout = int(os.environ.get("ADAPTIVE_MIN_TIMEOUT_MS", "2000"))
+        self.slow_factor = float(os.environ.get("SLOW_SELECTOR_FACTOR", "1.5"))
+        self.history_file = os.environ.get("TIMEOUT_HISTORY_FILE", os.path.join(".cache", "selector_timings.json"))
+        self.history = self._load_history()
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _load_history(self):
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def timeout_for(self, selector, base_timeout, negative=False):
+        """计算选择器的超时(毫秒)
+
+        否定检查使用快速失败超时；启用自适应时取 历史p95 x 系数，并限制在[最小超时, 基础超时]之间
+        """
+        if negative:
+            return min(self.negative_timeout, base_timeout)
+        history = self.history.get(selector) if selector else None
+        if not self.adaptive or not history or len(history) < 5:
+            return base_timeout
+        adaptive_timeout = percentile(history, 95) * self.adaptive_factor
+        return int(min(max(adaptive_timeout, self.adaptive_min_timeout), base_timeout))
+
+    def record(self, selector, duration_ms):
+        """记录选择器一次成功等待的耗时"""
+        with self._lock:
+            self.samples[selector].append(duration_ms)
+
+    def is_transient(self, error):
+        """判断错误是否为可重试的临时性网络/导航错误"""
+        message = str(error)
+        return any(marker in message for marker in TRANSIENT_ERROR_MARKERS)
+
+    def retry(self, func, description="operation"):
+        """执行函数，遇到临时性错误时按指数退避重试"""
+        for attempt in range(self.navigation_retries + 1):
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= self.navigation_retries or not self.is_transient(e):
+                    raise
+                delay = self.retry_backoff * (2 ** attempt) / 1000
+                print(f"{description} 失败({str(e).splitlines()[0]})，{delay:.1f}s后进行第{attempt + 1}次重试")
+                time.sleep(delay)
+
+    def slow_selectors(self):
+        """返回本次运行平均等待耗时超过历史平均值 SLOW_SELECTOR_FACTOR 倍的选择器"""
+        slow = []
+        with self._lock:
+            samples = {selector: list(values) for selector, values in self.samples.items()}
+        for selector, values in samples.items():
+            history = self.history.get(selector)
+            if not history or len(history) < 5:
+                continue
+            current_mean = sum(values) / len(values)
+            history_mean = sum(history) / len(history)
+            if history_mean > 0 and current_mean > history_mean * self.slow_factor:
+                slow.append({
+                    "selector": selector,
+                    "history_mean_ms": round(history_mean, 2),
+                    "current_mean_ms": round(current_mean, 2)
+                })
+        return slow
+
+    def report(self):
+        """输出变慢的选择器"""
+        for item in self.slow_selectors():
+            print(f"警告: 选择器 '{item['selector']}' 等待耗时变慢: "
+                  f"历史平均 {item['history_mean_ms']}ms -> 本次平均 {item['current_mean_ms']}ms")
+
+    def save(self):
+        """将本次样本合并到历史文件(重新读取后合并，减少并行worker之间的覆盖)"""
+        with self._lock:
+            samples = {selector: list(values) for selector, values in self.samples.items()}
+        if not samples:
+            return
+        history = self._load_history()
+        for selector, values in samples.items():
+            history[selector] = (history.get(selector, []) + [round(value, 2) for value in values])[-HISTORY_SIZE:]
+
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.history_file}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(history, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.history_file)
+
+
+# 全局超时策略
+timeout_policy = TimeoutPolicy()
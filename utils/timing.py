@@ -0,0 +1,122 @@
+import csv
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def percentile(values, pct):
+    """按最近秩法计算百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class PerfRecorder:
+    """性能计时记录器，按操作名汇总耗时(毫秒)
+
+    PERF_TIMING=false 时不记录任何数据。
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("PERF_TIMING", "true").lower() == "true"
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name, duration_ms):
+        """记录一次操作耗时"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.samples[name].append(duration_ms)
+
+    @contextmanager
+    def measure(self, name):
+        """计时上下文管理器"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name):
+        """计时装饰器"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def begin(self, name):
+        """开始一段跨函数的计时(例如before_step/after_step钩子之间)，按线程区分"""
+        if not hasattr(self._local, "starts"):
+            self._local.starts = {}
+        self._local.starts[name] = time.perf_counter()
+
+    def end(self, name):
+        """结束由begin开始的计时并记录"""
+        starts = getattr(self._local, "starts", {})
+        start = starts.pop(name, None)
+        if start is not None:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        """按操作汇总统计，按总耗时降序排列"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        rows = []
+        for name, values in samples.items():
+            rows.append({
+                "operation": name,
+                "count": len(values),
+                "total_ms": round(sum(values), 2),
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "max_ms": round(max(values), 2)
+            })
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def write_report(self, worker_id="0"):
+        """将统计写入JSON和CSV报告，返回报告路径"""
+        rows = self.summary()
+        if not rows:
+            return []
+        report_dir = os.environ.get("PERF_REPORT_DIR", os.path.join("reports", "perf"))
+        os.makedirs(report_dir, exist_ok=True)
+        json_path = os.path.join(report_dir, f"perf_report_{worker_id}.json")
+        csv_path = os.path.join(report_dir, f"perf_report_{worker_id}.csv")
+
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump({"worker": worker_id, "operations": rows}, file, ensure_ascii=False, indent=2)
+        with open(csv_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        return [json_path, csv_path]
+
+    def print_top(self, top_n=None):
+        """按最大单次耗时输出最慢的N个操作"""
+        top_n = top_n or int(os.environ.get("PERF_TOP_N", "10"))
+        rows = sorted(self.summary(), key=lambda row: row["max_ms"], reverse=True)[:top_n]
+        if not rows:
+            return
+        print(f"最慢的{len(rows)}个操作:")
+        for row in rows:
+            print(f"  {row['operation']}: 次数 {row['count']}, p50 {row['p50_ms']}ms, "
+                  f"p95 {row['p95_ms']}ms, 最大 {row['max_ms']}ms")
+
+
+# 全局计时记录器
+perf_recorder = PerfRecorder()
+timed = perf_recorder.timed